@@ -0,0 +1,17 @@
+'''
+Efreitris, single player terminal based game inspired on Tetris.
+
+Importing the package (or any of its modules) has no side effect: the game is started by `main()`,
+or with `python -m efreitris`. The engine can be used on its own, from `efreitris.state`.
+'''
+__all__ = ['main']
+
+
+def main(argv: list[str] | None = None) -> None:
+    '''
+    Runs the game, until the player quits.
+
+    :param argv: The command line arguments (see `python -m efreitris --help`). Defaults to the ones of the program.
+    '''
+    from .app import main as run
+    run(argv)
@@ -0,0 +1,320 @@
+import sys
+
+from . import instrument, pieces
+from .bitboard import Bitboard
+from .constants import boards
+from .display import Renderer, ask_position, blocks_lines, board_lines, clear_screen, display_blocks, display_board, enable_ansi, menu, yesno_question
+from .game import place_block, save_game
+from .journal import DEFAULT_PATH, JournalWriter
+from .pieces import Piece
+from .saves import DEFAULT_SLOT, CorruptedSaveError, delete_slot, list_slots, read_save
+from .state import GameState
+
+# Like `typing.TYPE_CHECKING`, which type checkers understand as well, without importing `typing` at startup.
+TYPE_CHECKING = False
+if TYPE_CHECKING:
+    from .hint import Hint
+
+# Whether the player allowed the game to clear the terminal (asked by `main`).
+allow_clear = False
+
+def tutorial():
+    '''
+    Displays a short tutorial of the game.
+    '''
+    if allow_clear:
+        clear_screen()
+    print('╔══════════════════════════════════════════════════════════════════╗')
+    print('║   Efreitris is a Tetris-like game. Your job is to fill a board   ║')
+    print('║  with blocks to clear lines and columns and earn the most points ║')
+    print('║   that you can! But place your blocks wisely.. If you fill the   ║')
+    print('║      board so much that you cannot place anymore, you lose.      ║')
+    print('╚══════════════════════════════════════════════════════════════════╝')
+    input('-- Press ENTER to continue --')
+    print('╔══════════════════════════════════════════════════════════════════╗')
+    print('║   For each game, you can choose between three different boards:  ║')
+    print('║     Circle, Diamond and Triangle. They all come in 3 sizes!      ║')
+    print('║  They all have their own blocks, in addition to the common ones. ║')
+    print('║                       Let\'s look at them!                        ║')
+    print('╚══════════════════════════════════════════════════════════════════╝')
+    input('-- Press ENTER to continue --')
+    print('Here is the CIRCLE board:\n')
+    display_board(boards.SMALL_CIRCLE_BOARD)
+    input('\n-- Press ENTER to continue --')
+    print('Now, the DIAMOND board:\n')
+    display_board(boards.SMALL_DIAMOND_BOARD)
+    input('\n-- Press ENTER to continue --')
+    print('And finally, the TRIANGLE board:\n')
+    display_board(boards.SMALL_TRIANGLE_BOARD)
+    input('\n-- Press ENTER to continue --')
+    print('╔══════════════════════════════════════════════════════════════════╗')
+    print('║        At every turn, you will choose between three blocks       ║')
+    print('║               (or five if you play in easy mode.)                ║')
+    print('║      Then, you will have to carefully place the chosen one.      ║')
+    print('║                     Let\'s see how to do this!                    ║')
+    print('╚══════════════════════════════════════════════════════════════════╝')
+    input('-- Press ENTER to continue --\n')
+    example_board = Bitboard(boards.SMALL_DIAMOND_BOARD)
+    display_board(example_board)
+    display_blocks(pieces.COMMON_PIECES[:1])
+    print('╔══════════════════════════════════════════════════════════════════╗')
+    print('║     For example here, I\'m playing on the Small Diamond Board     ║')
+    print('║                and want to place this small block.               ║')
+    print('║    When placing a block, you are asked the COORDINATES of where  ║')
+    print('║  you want to place it. These coordinates are represented like so ║')
+    print('║            "xY" (e.g. gG for the center of this board)           ║')
+    print('║   One important thing to remember is that a block\'s origin is    ║')
+    print('║     its BOTTOM LEFT corner. So, if I want to place my block      ║')
+    print('║      at top of the board, I should enter the gc coordinates      ║')
+    print('║                       Here is the result:                        ║')
+    print('╚══════════════════════════════════════════════════════════════════╝')
+    input('-- Press ENTER to continue --\n')
+    place_block(example_board, pieces.COMMON_PIECES[0], 6, 2)
+    display_board(example_board)
+    input('-- Press ENTER to continue --')
+    print('╔══════════════════════════════════════════════════════════════════╗')
+    print('║                                                                  ║')
+    print('║              Well, you know everything you need now.             ║')
+    print('║                     Good luck and have fun!                      ║')
+    print('║                                                                  ║')
+    print('╚══════════════════════════════════════════════════════════════════╝')
+    input('-- Press ENTER to play! --')
+
+def choose_game(saved: tuple[int, int, str, list[list[int]]] = None) -> tuple[list[list[int]], str, int]:
+    '''
+    Asks the player the options of a new game, unless a save is resumed.
+
+    :param saved: The content of the save, if there was one.
+    :returns: The board, the type of board and the difficulty of the game.
+    '''
+    if saved:
+        return (saved[3], saved[2], saved[1])
+    print('On what board do you want to play?')
+    i = menu(['Circle', 'Diamond', 'Triangle'])
+    board_type = ['CIRCLE','DIAMOND', 'TRIANGLE'][i - 1]
+    print('What size of board do you want to use?')
+    i = menu(['Small', 'Medium', 'Large'])
+    size_choice = ['SMALL', 'MEDIUM', 'LARGE'][i - 1]
+    board = getattr(boards, f'{size_choice}_{board_type}_BOARD')
+    print('What difficulty do you want to play?')
+    difficulty = menu(['Easy', 'Normal'])
+    return (board, board_type, difficulty)
+
+def offer_lines(blocks: list[Piece]) -> list[str]:
+    '''
+    :param blocks: The offered blocks.
+    :returns: The lines of the panel of blocks shown under the board.
+    '''
+    # Imported on demand, as shutil takes a while to import.
+    import shutil
+    # A large offer fits on a single line once the blocks are truncated, if the terminal is wide enough.
+    compact = blocks_lines(blocks, compact=True)
+    if len(blocks) > 5 and len(compact[0]) <= shutil.get_terminal_size().columns:
+        return compact
+    lines = []
+    for i in range(0, len(blocks), 5):
+        lines += blocks_lines(blocks[i:i+5])
+    return lines
+
+def turn_frame(state: GameState, offer: list[str], last_turn: str | None = None) -> list[str]:
+    '''
+    :param state: The game, with the blocks of the turn offered.
+    :param offer: The panel of the offered blocks (see `offer_lines`).
+    :param last_turn: The time spent during the last turn, when profiling.
+    :returns: The lines of the screen of the turn.
+    '''
+    score_str = f' Score: {state.score} '
+    frame = ['-'*len(score_str), score_str, '-'*len(score_str)]
+    frame += board_lines(state.board)
+    frame += offer
+    if not state.is_over():
+        placements = state.placements_available()
+        frame.append(f'{placements} placement{"s" if placements > 1 else ""} available')
+    if last_turn:
+        frame.append(f'Last turn: {last_turn}')
+    return frame
+
+def ask_move(state: GameState, hint: 'Hint') -> tuple[int, int, int] | None:
+    '''
+    Asks the player which block they want to place, and where. They have three attempts to give a valid position.
+
+    :param state: The game, with the blocks of the turn offered.
+    :param hint: The search for the best move, given to the player if they ask for it.
+    :returns: The (block index, x, y) move, or None if the player quit or failed to place the block
+    (the game is then ended).
+    '''
+    available_blocks = state.offered
+    i = -1
+    while i < 0 or i >= len(available_blocks):
+        try:
+            val = input(f'What block do you want to place? [1-{len(available_blocks)}, hint]: ').lower()
+            if val in ['exit', 'quit', 'stop']:
+                return None
+            elif val in ['hint', 'h']:
+                move = hint.result()
+                if move is None:
+                    print('Hint: no move found.')
+                else:
+                    (k, hx, hy) = move
+                    print(f'Hint: block {k + 1} at {chr(hx + 97)}{chr(hy + 65)}')
+            else:
+                i = int(val) - 1
+        except:
+            i = -1
+    x,y = ask_position(state.board)
+    if x == -1:
+        return None
+    attempts = 2
+    while not state.can_place(i, x, y) and attempts > 0:
+        print(f'You can\'t place this block here! ({attempts} attempt{"s" if attempts > 1 else ""} remaning)')
+        x,y = ask_position(state.board)
+        attempts -= 1
+    if not state.can_place(i, x, y):
+        state.end('attempts')
+        return None
+    return (i, x, y)
+
+def end_game(state: GameState, difficulty: int, board_type: str, slot: str) -> None:
+    '''
+    The end of game screen: either the player lost, or they quit and can save the game.
+
+    :param state: The game.
+    :param difficulty: The difficulty of the game.
+    :param board_type: The type of board.
+    :param slot: The save slot the game was resumed from, proposed when saving the game.
+    '''
+    if state.is_over():
+        if allow_clear:
+            clear_screen()
+            display_board(state.board)
+        if state.end_cause == 'no_move':
+            print('\nNone of the offered blocks can be placed anymore.', end='')
+        print(f'\nYou lost! Well played though, you earned {state.score} points!')
+        input('--Press ENTER to go back to the main menu--')
+    elif yesno_question('Do you want to save the game?'):
+        name = None
+        while name is None:
+            name = input(f'In which slot? (letters, digits, - and _) [{slot}]: ').strip() or slot
+            try:
+                save_game(state.score, difficulty, board_type, state.board, name)
+            except ValueError:
+                name = None
+
+def play(saved: tuple[int, int, str, list[list[int]]] = None, slot: str = DEFAULT_SLOT):
+    '''
+    Handles all the logic of one game:
+        1. Options selection
+        2. Game loop
+        3. End of game screen
+    :param saved: The content of the save, if there was one.
+    :param slot: The save slot the game was resumed from, proposed when saving the game.
+    '''
+    # Imported on demand, with the bot, as the menus don't need them.
+    from .hint import Hint
+    if allow_clear:
+        clear_screen()
+    # 1. Options selection
+    (board, board_type, difficulty) = choose_game(saved)
+
+    # 2. Game loop
+    state = GameState(board, board_type, difficulty, saved[0] if saved else 0)
+    state.journal = JournalWriter(DEFAULT_PATH, state)
+    # The whole screen is drawn at once, and only what changed is redrawn.
+    renderer = Renderer() if allow_clear else None
+    last_turn = None
+    if instrument.active:
+        instrument.reset()
+    while True:
+        available_blocks = state.offer()
+        frame = turn_frame(state, offer_lines(available_blocks), last_turn)
+        if renderer:
+            renderer.draw(frame)
+        else:
+            sys.stdout.write('\n'.join(frame) + '\n')
+        if state.is_over():
+            # None of the offered blocks fits anywhere, there is no point in asking the player.
+            break
+        # The best move is searched while the player thinks, in case they ask for a hint.
+        hint = Hint(state.board, available_blocks)
+        move = ask_move(state, hint)
+        hint.cancel()
+        if move:
+            state.step(*move)
+        if instrument.active:
+            last_turn = instrument.format_turn(instrument.end_turn())
+        if not move:
+            break
+    state.journal.close()
+    if instrument.active:
+        print('\n'.join(instrument.summary()))
+    # 3. End of game screen (either loss or exit)
+    end_game(state, difficulty, board_type, slot)
+
+def main(argv: list[str] | None = None):
+    '''
+    Runs the game, until the player quits.
+
+    :param argv: The command line arguments. Defaults to the ones of the program.
+    '''
+    global allow_clear
+    # Imported on demand, as it takes a while to import and is only needed once.
+    import argparse
+    parser = argparse.ArgumentParser(prog='efreitris', description='Efreitris, a Tetris-like game in the terminal.')
+    parser.add_argument('--profile', action='store_true',
+                        help=f'measure where the time of every turn goes (also enabled by {instrument.ENV_VAR}=1)')
+    parser.add_argument('--async', dest='use_async', action='store_true',
+                        help='prepare the next turn while the player is thinking, with an asyncio game loop')
+    args = parser.parse_args(argv)
+    if args.profile or instrument.enabled_by_environment():
+        instrument.enable()
+    print('\n')
+    import shutil
+    (width, height) = shutil.get_terminal_size()
+    if (width < 100 or height < 30):
+        # The terminal is asked to resize itself with an escape sequence, which not all terminals support.
+        if enable_ansi():
+            sys.stdout.write('\033[8;40;100t')
+        print('It is recommended to play Efreitris in a 100x40 (at least) terminal for the best experience.')
+
+    if args.use_async:
+        # Imported on demand, as asyncio takes a while to import.
+        from .asyncplay import run as play_game
+    else:
+        play_game = play
+    allow_clear = yesno_question('Do you allow efreitris to clear your terminal for a better playing experience?')
+    main_menu_choice = 0
+    while main_menu_choice != 3:
+        if allow_clear:
+            clear_screen()
+        print('███████╗███████╗██████╗ ███████╗██╗████████╗██████╗ ██╗███████╗')
+        print('██╔════╝██╔════╝██╔══██╗██╔════╝██║╚══██╔══╝██╔══██╗██║██╔════╝')
+        print('█████╗  █████╗  ██████╔╝█████╗  ██║   ██║   ██████╔╝██║███████╗')
+        print('██╔══╝  ██╔══╝  ██╔══██╗██╔══╝  ██║   ██║   ██╔══██╗██║╚════██║')
+        print('███████╗██║     ██║  ██║███████╗██║   ██║   ██║  ██║██║███████║')
+        print('╚══════╝╚═╝     ╚═╝  ╚═╝╚══════╝╚═╝   ╚═╝   ╚═╝  ╚═╝╚═╝╚══════╝')
+        main_menu_choice = menu(['Play', 'Tutorial', 'Quit'])
+        match main_menu_choice:
+            case 1:
+                saved = None
+                slot = DEFAULT_SLOT
+                slots = list_slots()
+                if slots:
+                    print('Do you want to resume a saved game?')
+                    i = menu(slots + ['New game'])
+                    if i <= len(slots):
+                        slot = slots[i - 1]
+                        try:
+                            saved = read_save(slot)
+                        except CorruptedSaveError as e:
+                            print(f'We\'re sorry, the save "{slot}" is corrupted ({e}).')
+                            if yesno_question('Do you want to delete it?'):
+                                delete_slot(slot)
+                            else:
+                                print('The file was left untouched, saving this game in the same slot will replace it.')
+                            input('-- Press ENTER to start a new game --')
+                play_game(saved, slot)
+            case 2:
+                tutorial()
+
+    if allow_clear:
+        clear_screen()
@@ -0,0 +1,123 @@
+'''
+The game loop driven by asyncio, so that the next turn is prepared while the player is thinking:
+    python -m efreitris --async
+
+The prompts run in a daemon thread, so reading the standard input never blocks the event loop, and interrupting the
+game (Ctrl-C) doesn't wait for a prompt to be answered. While the player types their
+move, the loop draws the next offer (see `GameState.prefetch`) and renders its panel of blocks. Once the move is entered,
+only what depends on it is left to do: the move itself, the board and the number of placements of the new offer,
+which only counts the blocks again on the rows the move changed (see `bitboard.PlacementCounts`).
+'''
+import asyncio
+import sys
+import threading
+from typing import Awaitable, Callable, TypeVar
+
+from . import app, instrument
+from .display import Renderer, clear_screen
+from .hint import Hint
+from .journal import DEFAULT_PATH, JournalWriter
+from .saves import DEFAULT_SLOT
+from .state import GameState
+
+T = TypeVar('T')
+
+
+def in_thread(function: Callable[..., T], *args) -> Awaitable[T]:
+    '''
+    Runs a function in a daemon thread, like `asyncio.to_thread` does in a thread of the default executor. The prompts
+    block in `input`, and `asyncio.run` waits for the threads of the executor once interrupted, which a daemon thread
+    doesn't hold up.
+
+    :param function: The function.
+    :param args: Its arguments.
+    :returns: The future of its result.
+    '''
+    loop = asyncio.get_running_loop()
+    future = loop.create_future()
+
+    def settle(error: BaseException | None, result: T | None) -> None:
+        if future.done():
+            # Cancelled in the meantime.
+            return
+        if error is not None:
+            future.set_exception(error)
+        else:
+            future.set_result(result)
+
+    def run() -> None:
+        # Kept alive until the function returns: the interpreter closes the standard input when it exits, which it can't
+        # do while this thread is blocked reading it.
+        stdin = sys.stdin
+        try:
+            (error, result) = (None, function(*args))
+        except BaseException as e:
+            (error, result) = (e, None)
+        try:
+            loop.call_soon_threadsafe(settle, error, result)
+        except RuntimeError:
+            # The loop was closed while the function was running, nobody waits for its result anymore.
+            pass
+
+    threading.Thread(target=run, daemon=True).start()
+    return future
+
+async def prefetch(state: GameState) -> list[str]:
+    '''
+    Prepares what the next turn doesn't need the move for.
+
+    :param state: The game, with the blocks of the current turn offered.
+    :returns: The panel of the blocks of the next offer (see `app.offer_lines`).
+    '''
+    return app.offer_lines(state.prefetch())
+
+async def play(saved: tuple[int, int, str, list[list[int]]] = None, slot: str = DEFAULT_SLOT) -> None:
+    '''
+    Handles all the logic of one game, like `app.play`.
+
+    :param saved: The content of the save, if there was one.
+    :param slot: The save slot the game was resumed from, proposed when saving the game.
+    '''
+    if app.allow_clear:
+        clear_screen()
+    (board, board_type, difficulty) = await in_thread(app.choose_game, saved)
+
+    state = GameState(board, board_type, difficulty, saved[0] if saved else 0)
+    state.journal = JournalWriter(DEFAULT_PATH, state)
+    renderer = Renderer() if app.allow_clear else None
+    last_turn = None
+    if instrument.active:
+        instrument.reset()
+    upcoming = None
+    while True:
+        available_blocks = state.offer()
+        frame = app.turn_frame(state, upcoming or app.offer_lines(available_blocks), last_turn)
+        if renderer:
+            renderer.draw(frame)
+        else:
+            sys.stdout.write('\n'.join(frame) + '\n')
+        if state.is_over():
+            break
+        hint = Hint(state.board, available_blocks)
+        # The prompts only read the board and the current offer, while the prefetch only draws the next one.
+        asking = in_thread(app.ask_move, state, hint)
+        next_turn = asyncio.create_task(prefetch(state))
+        move = await asking
+        hint.cancel()
+        upcoming = await next_turn
+        if move:
+            state.step(*move)
+        if instrument.active:
+            last_turn = instrument.format_turn(instrument.end_turn())
+        if not move:
+            break
+    state.journal.close()
+    if instrument.active:
+        print('\n'.join(instrument.summary()))
+    await in_thread(app.end_game, state, difficulty, board_type, slot)
+
+def run(saved: tuple[int, int, str, list[list[int]]] = None, slot: str = DEFAULT_SLOT) -> None:
+    '''
+    Plays one game with the asyncio loop. Used in place of `app.play`.
+    '''
+    asyncio.run(play(saved, slot))
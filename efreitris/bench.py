@@ -0,0 +1,299 @@
+'''
+Microbenchmarks of the hot paths of `game`, on every board, with both representations of the boards
+(the matrices of the original game and the bitboards the game now plays on):
+    python -m efreitris.bench -o bench.json
+    python -m efreitris.bench -o new.json --compare bench.json
+
+Each board is benchmarked in a realistic state: filled at 40% by random moves, from a fixed seed.
+The results are written as JSON, one entry per (board, representation, benchmark) with the time per call.
+Clearing several rows is timed both at once (`clear_4_rows`, like the end of a turn) and one by one from the top
+(`clear_4_rows_one_by_one`, like the original game), which shows what clearing them in a single pass saves.
+
+With `--scaling`, the bitboards are benchmarked on boards of every type from 25x25 to 1000x1000 instead
+(see `shapes`), to see how the hot paths scale with the size of the board. Their cells are filled at random.
+'''
+import argparse
+import json
+import os
+import platform
+import random
+import subprocess
+import tempfile
+import time
+from copy import deepcopy
+from typing import Callable
+
+from . import saves, shapes
+from .bitboard import Bitboard
+from .constants import boards
+from .game import clear_col, clear_lines, clear_row, col_state, fetch_save, lines_score, place_block, row_state, save_game, valid_position
+from .simulate import moves, random_policy
+from .state import GameState
+
+BOARD_TYPES = ['CIRCLE', 'DIAMOND', 'TRIANGLE']
+SIZES = ['SMALL', 'MEDIUM', 'LARGE']
+# The share of the playable cells filled in the benchmarked states.
+FILL = 0.4
+SEED = 0
+# The sizes of the (square) boards of the scaling benchmarks.
+SCALING_SIZES = [25, 50, 100, 250, 500, 1000]
+# How many positions `valid_position` is timed on, at most, in the scaling benchmarks.
+SCALING_POSITIONS = 20_000
+
+
+def filled_state(size: str, board_type: str, seed: int = SEED) -> GameState:
+    '''
+    Plays random moves until enough cells are filled.
+
+    :param size: The size of the board.
+    :param board_type: The type of board.
+    :param seed: The seed of the game, and of the moves.
+    :returns: The game, with its last offer still available.
+    '''
+    state = GameState(getattr(boards, f'{size}_{board_type}_BOARD'), board_type, 1, seed=seed)
+    rng = random.Random(seed)
+    playable = sum(bin(mask).count('1') for mask in state.board.playable)
+    while True:
+        state.offer()
+        if state.is_over():
+            return state
+        if sum(bin(mask).count('1') for mask in state.board.filled) >= FILL * playable:
+            return state
+        state.step(*random_policy(state, rng))
+
+def random_state(board_type: str, size: int, seed: int = SEED) -> GameState:
+    '''
+    Fills the cells of a generated board at random: random moves would take too long to fill the largest ones.
+
+    :param board_type: The type of board.
+    :param size: The height and width of the board (see `shapes.board`).
+    :param seed: The seed of the game, and of the filled cells.
+    :returns: The game, with its first offer available.
+    '''
+    grid = [list(row) for row in shapes.board(board_type, size, size)]
+    rng = random.Random(seed)
+    for row in grid:
+        for j in range(len(row)):
+            if row[j] == 1 and rng.random() < FILL:
+                row[j] = 2
+    state = GameState(grid, board_type, 1, seed=seed)
+    state.offer()
+    return state
+
+def fill_line(grid: list[list[int]], y: int | None = None, x: int | None = None) -> None:
+    '''
+    Fills every playable cell of a row or a column. Modifies the provided grid **in-place**.
+    '''
+    for j in range(len(grid)):
+        for i in range(len(grid[0])):
+            if (j == y or i == x) and grid[j][i] == 1:
+                grid[j][i] = 2
+
+def timed(call: Callable, inputs: Callable[[], list[tuple]], repeat: int) -> tuple[float, int]:
+    '''
+    :param call: The function to benchmark.
+    :param inputs: Builds the arguments of a batch of calls. It is called before each batch, outside of the timer,
+    so that the functions modifying their arguments get fresh ones.
+    :param repeat: How many batches to run. The best time is kept, as the others only add noise.
+    :returns: The time per call in nanoseconds, and the number of calls in a batch.
+    '''
+    best = float('inf')
+    for _ in range(repeat):
+        batch = inputs()
+        start = time.perf_counter_ns()
+        for args in batch:
+            call(*args)
+        best = min(best, time.perf_counter_ns() - start)
+    return (best / len(batch), len(batch))
+
+def clear_and_score(board: list[list[int]] | Bitboard) -> int:
+    '''
+    The end of a turn: clears every full line and scores the move.
+    '''
+    (rows, cols, row_cells, col_cells) = clear_lines(board)
+    return lines_score(len(rows), len(cols), row_cells, col_cells)
+
+def clear_rows_one_by_one(board: list[list[int]] | Bitboard, rows: list[int]) -> int:
+    '''
+    Clears full rows one by one from the top, as the original game does.
+    '''
+    return sum(clear_row(board, i) for i in rows)
+
+def board_benchmarks(state: GameState, as_list: bool, repeat: int, positions: int | None = None,
+                     save: bool = True) -> dict[str, tuple[float, int]]:
+    '''
+    Times every benchmark on one board.
+
+    :param state: The game, with blocks offered (see `filled_state`).
+    :param as_list: Whether to use the matrices instead of the bitboards.
+    :param repeat: How many times each benchmark is run.
+    :param positions: How many positions `valid_position` is timed on, at most. By default, all of them.
+    :param save: Whether to time the saves too.
+    :returns: The time per call (in nanoseconds) and the number of calls, by benchmark.
+    '''
+    grid = state.board.to_grid()
+    (height, width) = (len(grid), len(grid[0]))
+    make = deepcopy if as_list else Bitboard
+    # The boards given to the benchmarks modifying them are copies of boards built once, which is much faster
+    # than building them from the matrices on the largest boards.
+    copy = deepcopy if as_list else Bitboard.copy
+    board = make(grid)
+    if positions is None or len(state.offered) * height * width <= positions:
+        # Every block of the offer, at every position of the board: most don't fit.
+        candidates = [(board, piece, i, j) for piece in state.offered for j in range(height) for i in range(width)]
+    else:
+        rng = random.Random(SEED)
+        candidates = [(board, rng.choice(state.offered), rng.randrange(width), rng.randrange(height)) for _ in range(positions)]
+    legal = [(state.offered[k], x, y) for (k, x, y) in moves(state)]
+    random.Random(SEED).shuffle(legal)
+    legal = legal[:200]
+    # The boards after each legal move, some of them with full lines.
+    after = []
+    for (piece, i, j) in legal:
+        b = copy(board)
+        place_block(b, piece, i, j)
+        after.append(b)
+    # A full row and a full column, in the middle of the board.
+    row_full = deepcopy(grid)
+    fill_line(row_full, y=height // 2)
+    row_full = make(row_full)
+    col_full = deepcopy(grid)
+    fill_line(col_full, x=width // 2)
+    col_full = make(col_full)
+    # Four full rows, in the middle of the board.
+    rows = list(range(height // 2 - 2, height // 2 + 2))
+    rows_full = deepcopy(grid)
+    for y in rows:
+        fill_line(rows_full, y=y)
+    rows_full = make(rows_full)
+
+    results = {}
+    results['valid_position'] = timed(valid_position, lambda: candidates, repeat)
+    results['place_block'] = timed(place_block, lambda: [(copy(board), piece, i, j) for (piece, i, j) in legal], repeat)
+    results['row_state'] = timed(row_state, lambda: [(board, i) for i in range(height)], repeat)
+    results['col_state'] = timed(col_state, lambda: [(board, i) for i in range(width)], repeat)
+    results['clear_row'] = timed(clear_row, lambda: [(copy(row_full), height // 2) for _ in range(50)], repeat)
+    results['clear_col'] = timed(clear_col, lambda: [(copy(col_full), width // 2) for _ in range(50)], repeat)
+    results['clear_4_rows'] = timed(clear_lines, lambda: [(copy(rows_full),) for _ in range(50)], repeat)
+    results['clear_4_rows_one_by_one'] = timed(clear_rows_one_by_one, lambda: [(copy(rows_full), rows) for _ in range(50)], repeat)
+    results['clear_and_score'] = timed(clear_and_score, lambda: [(copy(b),) for b in after], repeat)
+    if not save:
+        return results
+    # Saves are written in a temporary directory, in the default slot.
+    with tempfile.TemporaryDirectory() as directory:
+        previous = saves.SAVE_DIR
+        saves.SAVE_DIR = directory
+        try:
+            results['save_game'] = timed(save_game, lambda: [(state.score, 1, state.board_type, board)] * 10, repeat)
+            results['fetch_save'] = timed(fetch_save, lambda: [()] * 10, repeat)
+        finally:
+            saves.SAVE_DIR = previous
+    return results
+
+def revision() -> str | None:
+    '''
+    :returns: The git commit of the code being benchmarked, if known.
+    '''
+    try:
+        return subprocess.run(['git', 'rev-parse', 'HEAD'], cwd=os.path.dirname(os.path.abspath(__file__)),
+                              capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+def run_all(repeat: int = 5, representations: list[str] = ['bitboard', 'list']) -> dict:
+    '''
+    Runs every benchmark on every board.
+
+    :param repeat: How many times each benchmark is run.
+    :param representations: The representations of the boards to benchmark ('bitboard' and/or 'list').
+    :returns: The report, as written in the output file.
+    '''
+    results = []
+    for size in SIZES:
+        for board_type in BOARD_TYPES:
+            for representation in representations:
+                state = filled_state(size, board_type)
+                for (name, (ns, calls)) in board_benchmarks(state, representation == 'list', repeat).items():
+                    results.append({
+                        'board': f'{size}_{board_type}',
+                        'representation': representation,
+                        'benchmark': name,
+                        'ns_per_call': round(ns, 1),
+                        'calls': calls,
+                    })
+    return {
+        'revision': revision(),
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'repeat': repeat,
+        'results': results,
+    }
+
+def run_scaling(repeat: int = 5, sizes: list[int] = SCALING_SIZES) -> dict:
+    '''
+    Runs the benchmarks of the bitboards on generated boards of every size.
+
+    :param repeat: How many times each benchmark is run.
+    :param sizes: The sizes of the boards.
+    :returns: The report, as written in the output file. The boards are named like 'CIRCLE_100x100'.
+    '''
+    results = []
+    for board_type in BOARD_TYPES:
+        for size in sizes:
+            state = random_state(board_type, size)
+            name = f'{board_type}_{state.board.height}x{state.board.width}'
+            for (benchmark, (ns, calls)) in board_benchmarks(state, False, repeat, SCALING_POSITIONS, save=False).items():
+                results.append({
+                    'board': name,
+                    'representation': 'bitboard',
+                    'benchmark': benchmark,
+                    'ns_per_call': round(ns, 1),
+                    'calls': calls,
+                })
+    return {
+        'revision': revision(),
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'repeat': repeat,
+        'results': results,
+    }
+
+def compare(report: dict, baseline: dict) -> list[str]:
+    '''
+    :param report: The new results.
+    :param baseline: The results to compare to.
+    :returns: One line per benchmark found in both, with the ratio of the times (below 1 is faster).
+    '''
+    def key(r: dict) -> tuple:
+        return (r['board'], r['representation'], r['benchmark'])
+    old = {key(r): r['ns_per_call'] for r in baseline['results']}
+    lines = []
+    for r in report['results']:
+        if key(r) in old and old[key(r)] > 0:
+            lines.append(f'{" ".join(key(r)):<52} {old[key(r)]:>12.1f} ns -> {r["ns_per_call"]:>12.1f} ns  x{r["ns_per_call"] / old[key(r)]:.2f}')
+    return lines
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description='Benchmarks the hot paths of Efreitris on every board.')
+    parser.add_argument('-o', '--output', default='bench.json', help='where to write the results (JSON)')
+    parser.add_argument('-r', '--repeat', type=int, default=5)
+    parser.add_argument('--representation', choices=['bitboard', 'list'], action='append', default=None)
+    parser.add_argument('--compare', default=None, help='results of a previous run to compare with')
+    parser.add_argument('--scaling', action='store_true', help='benchmark the bitboards on boards from 25x25 to 1000x1000 instead')
+    args = parser.parse_args()
+
+    if args.scaling:
+        report = run_scaling(args.repeat)
+    else:
+        report = run_all(args.repeat, args.representation or ['bitboard', 'list'])
+    with open(args.output, 'w') as f:
+        json.dump(report, f, indent=1)
+    if args.compare:
+        with open(args.compare) as f:
+            print('\n'.join(compare(report, json.load(f))))
+    else:
+        for r in report['results']:
+            print(f'{r["board"]:<18} {r["representation"]:<9} {r["benchmark"]:<24} {r["ns_per_call"]:>12.1f} ns')
+
+if __name__ == '__main__':
+    main()
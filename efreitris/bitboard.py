@@ -0,0 +1,558 @@
+import random
+from functools import lru_cache
+
+from .pieces import Piece
+
+# The prime modulo which the hashes of the boards are computed (the largest one below 2**64).
+ZOBRIST_MODULUS = 2**64 - 59
+
+
+def row_masks(row: list[int]) -> tuple[int, int]:
+    '''
+    Converts a row of a board into a pair of bitmasks.
+    The bit `j` of each mask represents the column `j` of the row.
+
+    :param row: The row to convert.
+    :returns: A tuple containing the mask of the playable cells (1 and 2) and the mask of the filled cells (2).
+    '''
+    playable = 0
+    filled = 0
+    for j in range(len(row)):
+        if row[j] != 0:
+            playable |= 1 << j
+            if row[j] == 2:
+                filled |= 1 << j
+    return (playable, filled)
+
+def in_bounds(board_width: int, board_height: int, width: int, height: int, i: int, j: int) -> bool:
+    '''
+    Checks whether a block of size `width`x`height` is contained in the board when placed at (i,j).
+
+    :param board_width: The width of the board.
+    :param board_height: The height of the board.
+    :param width: The actual width of the block.
+    :param height: The actual height of the block.
+    :param i: The x coordinate of the block on the board.
+    :param j: The y coordinate of the block on the board (from the bottom of the block).
+    :returns: Whether the block fits in the board's rectangle.
+    '''
+    return 0 <= i and i + width <= board_width and 0 <= j - height + 1 and j < board_height
+
+def anchor_mask(free: list[int], board_width: int, piece: Piece, j: int) -> int:
+    '''
+    Finds all the positions of a piece on the row `j` of a board at once.
+
+    :param free: The masks of the free cells of every row of the board.
+    :param board_width: The width of the board.
+    :param piece: The piece to place.
+    :param j: The y coordinate of the bottom of the piece. The piece must fit between the top of the board and this row.
+    :returns: A mask in which the bit x is set if the piece can be placed at (x, j).
+    '''
+    # Anchors too far right are never candidates.
+    anchors = (1 << max(board_width - piece.width + 1, 0)) - 1
+    for (dx, dy) in piece.cells:
+        # The square at (x + dx, j + dy) must be free, which shifting the row by dx aligns on x.
+        anchors &= free[j + dy] >> dx
+        if not anchors:
+            break
+    return anchors
+
+@lru_cache(maxsize=None)
+def zobrist_keys(height: int, width: int) -> tuple[int, ...]:
+    '''
+    :param height: The height of the board.
+    :param width: The width of the board.
+    :returns: A random key per row of the board, below `ZOBRIST_MODULUS`. The key of the cell (y, j) is `keys[y] << j`
+    (modulo `ZOBRIST_MODULUS`). The keys are always the same for a given size, so that hashes can be compared between
+    processes and runs.
+    '''
+    rng = random.Random(f'zobrist:{height}x{width}')
+    return tuple(rng.randrange(1, ZOBRIST_MODULUS) for _ in range(height))
+
+def bits(mask: int):
+    '''
+    Iterates over the indexes of the bits set in a mask, from the lowest one.
+
+    :param mask: The mask.
+    '''
+    while mask:
+        lowest = mask & -mask
+        yield lowest.bit_length() - 1
+        mask ^= lowest
+
+
+@lru_cache(maxsize=4096)
+def mask_columns(mask: int) -> tuple[int, ...]:
+    '''
+    :param mask: The mask of some cells of a row.
+    :returns: The indexes of the bits set in the mask, from the lowest one (see `bits`). The cleared rows are most
+    often full, and so always have the same masks: their columns are only looked for once.
+    '''
+    return tuple(bits(mask))
+
+
+class Bitboard:
+    '''
+    A board stored as integer bitmasks rather than as a matrix.
+    Each row is represented by two masks: one for the playable cells and one for the filled cells,
+    the bit `j` of a mask representing the column `j`. A filled cell is always playable.
+
+    A row is full when its two masks are equal. The number of free cells of every column is kept up to date by each
+    change, from the masks of the cells it fills or empties, and the lines which may have become full are kept aside
+    (`row_candidates`, `col_candidates`). Hence, full lines are found without looking at the lines a move didn't touch.
+
+    The hash of the filled cells (`zobrist`) is the sum of the keys of the filled cells modulo `ZOBRIST_MODULUS`,
+    the key of the cell (y, j) being `keys[y] << j` (see `zobrist_keys`): the cells of a row are hashed at once,
+    with `keys[y] * filled[y]`. It is updated the same way, by the cells each change fills or empties, one row at a time.
+    As boards of different types can have the same size, the playable cells, which never change, have a hash of their own (`shape`).
+    The lines without any playable cell (`empty_rows`, `empty_cols`) are always full, hence always candidates.
+
+    A Bitboard can be read like a `list[list[int]]` board (`len(board)`, `board[i][j]`, iteration),
+    so that it can be displayed and saved like one.
+    '''
+    __slots__ = ('width', 'height', 'playable', 'filled', 'col_free', 'col_playable', 'row_candidates', 'col_candidates',
+                 'empty_rows', 'empty_cols', 'keys', 'zobrist', 'shape')
+
+    def __init__(self, grid: list[list[int]]):
+        '''
+        :param grid: The matrix to build the board from. It is not modified nor kept.
+        '''
+        self.height = len(grid)
+        self.width = len(grid[0])
+        self.playable = []
+        self.filled = []
+        col_free = [0] * self.width
+        col_playable = [0] * self.width
+        for row in grid:
+            (playable, filled) = row_masks(row)
+            self.playable.append(playable)
+            self.filled.append(filled)
+            for j in bits(playable):
+                col_playable[j] += 1
+                if not filled >> j & 1:
+                    col_free[j] += 1
+        self.col_free = col_free
+        # The number of playable cells of every column, which never changes.
+        self.col_playable = tuple(col_playable)
+        # The lines which may be full: every full line is in there, but some of them may not be full anymore.
+        self.row_candidates = {i for i in range(self.height) if self.playable[i] == self.filled[i]}
+        self.col_candidates = {j for j in range(self.width) if col_free[j] == 0}
+        self.empty_rows = frozenset(i for i in range(self.height) if self.playable[i] == 0)
+        self.empty_cols = frozenset(j for j in range(self.width) if col_playable[j] == 0)
+        self.keys = zobrist_keys(self.height, self.width)
+        self.zobrist = self.compute_zobrist()
+        self.shape = hash((self.width, tuple(self.playable)))
+
+    def copy(self) -> 'Bitboard':
+        '''
+        :returns: An independent copy of the board.
+        '''
+        board = Bitboard.__new__(Bitboard)
+        board.width = self.width
+        board.height = self.height
+        board.playable = self.playable[:]
+        board.filled = self.filled[:]
+        board.col_free = self.col_free[:]
+        board.col_playable = self.col_playable
+        board.row_candidates = set(self.row_candidates)
+        board.col_candidates = set(self.col_candidates)
+        board.empty_rows = self.empty_rows
+        board.empty_cols = self.empty_cols
+        board.keys = self.keys
+        board.zobrist = self.zobrist
+        board.shape = self.shape
+        return board
+
+    def compute_zobrist(self) -> int:
+        '''
+        :returns: The hash of the filled cells of the board, computed from scratch. It always equals `zobrist`.
+        '''
+        return sum(key * filled for (key, filled) in zip(self.keys, self.filled)) % ZOBRIST_MODULUS
+
+    def fits(self, piece: Piece, i: int, j: int) -> bool:
+        '''
+        Checks whether a piece can be placed at (i,j).
+
+        :param piece: The piece to place.
+        :param i: The x coordinate of the block on the board.
+        :param j: The y coordinate of the block on the board (from the bottom of the block).
+        :returns: Whether the block can be placed.
+        '''
+        masks = piece.masks
+        if not in_bounds(self.width, self.height, piece.width, len(masks), i, j):
+            return False
+        playable = self.playable
+        filled = self.filled
+        y = j - len(masks) + 1
+        for mask in masks:
+            mask <<= i
+            # Free cells are the playable ones which aren't filled yet, and every square of the block needs one.
+            if mask & (playable[y] ^ filled[y]) != mask:
+                return False
+            y += 1
+        return True
+
+    def place(self, piece: Piece, i: int, j: int) -> bool:
+        '''
+        Places a piece at (i,j) if it fits.
+
+        :param piece: The piece to place.
+        :param i: The x coordinate of the block on the board.
+        :param j: The y coordinate of the block on the board (from the bottom of the block).
+        :returns: Whether the block was successfully placed.
+        '''
+        if not self.fits(piece, i, j):
+            return False
+        playable = self.playable
+        filled = self.filled
+        keys = self.keys
+        zobrist = self.zobrist
+        y = j - piece.height + 1
+        for mask in piece.masks:
+            mask <<= i
+            filled[y] |= mask
+            zobrist += keys[y] * mask
+            if filled[y] == playable[y]:
+                self.row_candidates.add(y)
+            y += 1
+        self.zobrist = zobrist % ZOBRIST_MODULUS
+        col_free = self.col_free
+        for (dx, _) in piece.cells:
+            col_free[i + dx] -= 1
+            if col_free[i + dx] == 0:
+                self.col_candidates.add(i + dx)
+        return True
+
+    def remove(self, piece: Piece, i: int, j: int) -> None:
+        '''
+        Takes back a piece placed at (i,j), when no line was cleared since. Used to try moves without copying the board.
+
+        :param piece: The piece to remove.
+        :param i: The x coordinate of the block on the board.
+        :param j: The y coordinate of the block on the board (from the bottom of the block).
+        '''
+        filled = self.filled
+        keys = self.keys
+        zobrist = self.zobrist
+        y = j - piece.height + 1
+        for mask in piece.masks:
+            mask <<= i
+            filled[y] &= ~mask
+            zobrist -= keys[y] * mask
+            self.row_candidates.discard(y)
+            y += 1
+        self.zobrist = zobrist % ZOBRIST_MODULUS
+        col_free = self.col_free
+        for (dx, _) in piece.cells:
+            col_free[i + dx] += 1
+            self.col_candidates.discard(i + dx)
+
+    def free_rows(self) -> list[int]:
+        '''
+        :returns: The masks of the free cells (playable but not filled) of every row.
+        '''
+        playable = self.playable
+        filled = self.filled
+        return [playable[y] ^ filled[y] for y in range(self.height)]
+
+    def placements(self, piece: Piece) -> list[tuple[int, int]]:
+        '''
+        Lists every position at which a piece can be placed.
+
+        :param piece: The piece to place.
+        :returns: The valid (x, y) coordinates of the bottom left corner of the piece, row by row.
+        '''
+        free = self.free_rows()
+        placements = []
+        for j in range(piece.height - 1, self.height):
+            anchors = anchor_mask(free, self.width, piece, j)
+            while anchors:
+                lowest = anchors & -anchors
+                placements.append((lowest.bit_length() - 1, j))
+                anchors ^= lowest
+        return placements
+
+    def has_placement(self, piece: Piece) -> bool:
+        '''
+        :param piece: The piece to place.
+        :returns: Whether the piece can be placed anywhere. Stops at the first valid position found.
+        '''
+        free = self.free_rows()
+        for j in range(piece.height - 1, self.height):
+            if anchor_mask(free, self.width, piece, j):
+                return True
+        return False
+
+    def row_full(self, i: int) -> bool:
+        '''
+        :param i: The index of the row to verify.
+        :returns: Whether the row `i` has no free cell left.
+        '''
+        return self.playable[i] == self.filled[i]
+
+    def col_full(self, i: int) -> bool:
+        '''
+        :param i: The index of the column to verify.
+        :returns: Whether the column `i` has no free cell left.
+        '''
+        return self.col_free[i] == 0
+
+    def clear_row(self, i: int) -> int:
+        '''
+        Clears the row `i` and makes the rows above it fall down, respecting the shape of the board.
+
+        :param i: The index of the row to clear.
+        :returns: How many cells were cleared.
+        '''
+        return self.clear_rows([i])
+
+    def clear_rows(self, rows: list[int]) -> int:
+        '''
+        Clears several rows at once and makes the rows above them fall down, respecting the shape of the board.
+        The result is the same as clearing the rows one by one from the top to the bottom with `clear_row`,
+        but every row is only moved once.
+
+        :param rows: The indexes of the rows to clear.
+        :returns: How many cells were cleared.
+        '''
+        if not rows:
+            return 0
+        filled = self.filled
+        playable = self.playable
+        col_free = self.col_free
+        keys = self.keys
+        zobrist = self.zobrist
+        cleared_rows = set(rows)
+        cleared = 0
+        for i in cleared_rows:
+            cleared += filled[i].bit_count()
+            for j in mask_columns(filled[i]):
+                col_free[j] += 1
+        # Each remaining row falls by the number of cleared rows below it, from the bottom up, down to the row `d`.
+        # A filled cell goes through every row down to there, and is lost if any of them is non-playable at its column.
+        d = max(cleared_rows)
+        for y in range(d - 1, -1, -1):
+            if y in cleared_rows:
+                continue
+            cells = filled[y]
+            new = cells and cells & playable[y + 1]
+            if new and d > y + 1:
+                for t in range(y + 2, d + 1):
+                    new &= playable[t]
+            if new != cells:
+                for j in mask_columns(cells ^ new):
+                    col_free[j] += 1
+            before = filled[d]
+            if new != before:
+                zobrist += keys[d] * (new - before)
+                filled[d] = new
+            # Rows can become full by falling, if their free cells are non-playable below.
+            if new == playable[d]:
+                self.row_candidates.add(d)
+            d -= 1
+        # As many rows as were cleared are left empty at the top.
+        for y in range(d, -1, -1):
+            if filled[y]:
+                zobrist -= keys[y] * filled[y]
+                filled[y] = 0
+            if not playable[y]:
+                self.row_candidates.add(y)
+        self.zobrist = zobrist % ZOBRIST_MODULUS
+        return cleared
+
+    def clear_col(self, i: int) -> int:
+        '''
+        Clears the column `i`.
+
+        :param i: The index of the column to clear.
+        :returns: How many cells were cleared.
+        '''
+        return self.clear_cols([i])
+
+    def clear_cols(self, cols: list[int]) -> int:
+        '''
+        Clears several columns at once.
+
+        :param cols: The indexes of the columns to clear.
+        :returns: How many cells were cleared.
+        '''
+        if not cols:
+            return 0
+        columns = 0
+        for j in cols:
+            columns |= 1 << j
+        filled = self.filled
+        keys = self.keys
+        zobrist = self.zobrist
+        cleared = 0
+        for y in range(self.height):
+            cells = filled[y] & columns
+            if cells:
+                filled[y] ^= cells
+                zobrist -= keys[y] * cells
+                cleared += cells.bit_count()
+        self.zobrist = zobrist % ZOBRIST_MODULUS
+        # Every playable cell of the cleared columns is free. Columns without any playable cell stay full.
+        for j in cols:
+            self.col_free[j] = self.col_playable[j]
+            if j in self.empty_cols:
+                self.col_candidates.add(j)
+        return cleared
+
+    def clear_lines(self) -> tuple[list[int], list[int], int, int]:
+        '''
+        Clears every full row, then every full column, like `game.clear_lines` does.
+        Only the lines which may have become full are looked at, and the full rows are all cleared in a single pass.
+
+        :returns: The indexes of the cleared rows and columns, and how many cells were cleared by the rows and by the columns.
+        '''
+        # Clearing a row only moves the rows above it, so the rows cleared one by one from the top
+        # are exactly the rows which are full before any of them is cleared.
+        playable = self.playable
+        filled = self.filled
+        rows = sorted(i for i in self.row_candidates if playable[i] == filled[i])
+        self.row_candidates.clear()
+        row_cells = self.clear_rows(rows)
+        # Clearing rows only frees cells in the columns, so the full columns are among the candidates of the move.
+        # Columns are checked after the rows have fallen, and clearing one doesn't change the others.
+        cols = sorted(j for j in self.col_candidates if self.col_free[j] == 0)
+        self.col_candidates.clear()
+        col_cells = self.clear_cols(cols)
+        return (rows, cols, row_cells, col_cells)
+
+    def row(self, i: int) -> list[int]:
+        '''
+        :param i: The index of the row.
+        :returns: The row `i` in the `list[int]` format (0: non-playable, 1: free, 2: filled).
+        '''
+        playable = self.playable[i]
+        filled = self.filled[i]
+        return [(playable >> j & 1) + (filled >> j & 1) for j in range(self.width)]
+
+    def to_grid(self) -> list[list[int]]:
+        '''
+        :returns: The board in the `list[list[int]]` format.
+        '''
+        return [self.row(i) for i in range(self.height)]
+
+    def __len__(self) -> int:
+        return self.height
+
+    def __getitem__(self, i: int) -> list[int]:
+        if i < 0:
+            i += self.height
+        if not 0 <= i < self.height:
+            raise IndexError('board row index out of range')
+        return self.row(i)
+
+    def __iter__(self):
+        for i in range(self.height):
+            yield self.row(i)
+
+    def __eq__(self, other) -> bool:
+        if isinstance(other, Bitboard):
+            return self.width == other.width and self.playable == other.playable and self.filled == other.filled
+        return NotImplemented
+
+
+class PlacementCounts:
+    '''
+    Keeps track of how many positions each piece of a set can be placed at on a board.
+    The valid positions are stored as one mask per row of anchors (see `anchor_mask`),
+    and only the rows of anchors touched by a change of the board are computed again.
+
+    The owner of the board must report every change made to it through `changed` (or `placed`). Changes are only
+    recorded: the positions are computed again when they are asked for, so a board changed several times in a row,
+    or never looked at, costs nothing more. Only the pieces which are asked for are tracked (see `track`).
+    '''
+
+    def __init__(self, board: Bitboard, pieces: list[Piece] = ()):
+        '''
+        :param board: The board to track.
+        :param pieces: The pieces to count the positions of.
+        '''
+        self.board = board
+        self.anchors: dict[Piece, list[int]] = {}
+        self.counts: dict[Piece, int] = {}
+        # The rows (top, bottom) changed since the positions were last computed, if any.
+        self.dirty: tuple[int, int] | None = None
+        self.track(pieces)
+
+    def track(self, pieces: list[Piece]) -> None:
+        '''
+        Counts the positions of these pieces from now on, and stops counting the others.
+        The pieces which were already tracked are kept up to date, the others are counted on the whole board.
+
+        :param pieces: The pieces to count the positions of, such as the blocks offered to the player.
+        '''
+        pieces = set(pieces)
+        for piece in [piece for piece in self.anchors if piece not in pieces]:
+            del self.anchors[piece]
+            del self.counts[piece]
+        self.update()
+        board = self.board
+        free = None
+        for piece in pieces:
+            if piece not in self.anchors:
+                free = free or board.free_rows()
+                anchors = [0] * board.height
+                for j in range(piece.height - 1, board.height):
+                    anchors[j] = anchor_mask(free, board.width, piece, j)
+                self.anchors[piece] = anchors
+                self.counts[piece] = sum(mask.bit_count() for mask in anchors)
+
+    def changed(self, top: int, bottom: int) -> None:
+        '''
+        Reports that the rows `top` to `bottom` (included) of the board have changed.
+
+        :param top: The index of the first changed row.
+        :param bottom: The index of the last changed row.
+        '''
+        if self.dirty is not None:
+            top = min(top, self.dirty[0])
+            bottom = max(bottom, self.dirty[1])
+        self.dirty = (top, bottom)
+
+    def placed(self, piece: Piece, j: int) -> None:
+        '''
+        Reports that a piece was placed on the board.
+
+        :param piece: The piece which was placed.
+        :param j: The y coordinate of the bottom of the piece.
+        '''
+        self.changed(j - piece.height + 1, j)
+
+    def update(self) -> None:
+        '''
+        Computes the positions again on the rows of anchors touched by the changes reported since the last update.
+        '''
+        if self.dirty is None:
+            return
+        (top, bottom) = self.dirty
+        self.dirty = None
+        board = self.board
+        free = board.free_rows()
+        for (piece, anchors) in self.anchors.items():
+            # A piece placed on the row j covers the rows j - height + 1 to j.
+            count = self.counts[piece]
+            for j in range(max(top, piece.height - 1), min(bottom + piece.height, board.height)):
+                count -= anchors[j].bit_count()
+                anchors[j] = anchor_mask(free, board.width, piece, j)
+                count += anchors[j].bit_count()
+            self.counts[piece] = count
+
+    def count(self, piece: Piece) -> int:
+        '''
+        :param piece: One of the tracked pieces.
+        :returns: The number of positions the piece can be placed at.
+        '''
+        self.update()
+        return self.counts[piece]
+
+    def total(self, pieces: list[Piece]) -> int:
+        '''
+        :param pieces: Tracked pieces, such as the blocks offered to the player.
+        :returns: The number of (piece, position) moves available.
+        '''
+        self.update()
+        return sum(self.counts[piece] for piece in pieces)
@@ -0,0 +1,239 @@
+'''
+A bot playing Efreitris by searching the placements of the offered blocks.
+
+Every move is tried on the board itself and taken back afterwards (see `Bitboard.remove`), so trying a move costs
+a few bit operations: the board is only copied when the move clears lines, or when it is kept in the beam.
+Moves are scored with the rules of the game (`clear_lines`, `lines_score` and `block_value`), then valued by an evaluation.
+
+With a depth above 1, the bot looks ahead as if the same blocks were offered again, which the game doesn't promise:
+the lookahead only helps to keep the board open for the kind of blocks the board uses.
+    python -m efreitris.bot CIRCLE LARGE --width 8 --depth 2 --games 20
+'''
+import argparse
+import heapq
+import random
+import threading
+import time
+from functools import partial
+from operator import itemgetter
+from typing import Callable
+
+from .bitboard import Bitboard
+from .cache import PlacementCache
+from .game import block_value, clear_lines, lines_score
+from .pieces import Piece
+from .state import GameState
+
+# An evaluation values a board after a move: it receives the board (with its full lines cleared)
+# and the points earned by the move. The bot plays the moves leading to the highest values.
+Evaluation = Callable[[Bitboard, int], float]
+
+
+def points(board: Bitboard, earned: int) -> float:
+    '''
+    Only values the points earned.
+    '''
+    return earned
+
+def holes(board: Bitboard) -> tuple[int, int]:
+    '''
+    :param board: The board.
+    :returns: The number of free cells without any free neighbour (only the smallest block fits in them),
+    and the number of borders between free and non-free cells inside the board.
+    '''
+    isolated = 0
+    borders = 0
+    playable = board.playable
+    filled = board.filled
+    above = 0
+    above_playable = 0
+    for y in range(board.height):
+        free = playable[y] ^ filled[y]
+        below = playable[y + 1] ^ filled[y + 1] if y + 1 < board.height else 0
+        isolated += (free & ~(free << 1) & ~(free >> 1) & ~above & ~below).bit_count()
+        # Borders between horizontal neighbours, then with the row above, where both cells are playable.
+        borders += ((free ^ (free >> 1)) & playable[y] & (playable[y] >> 1)).bit_count()
+        borders += ((free ^ above) & playable[y] & above_playable).bit_count()
+        above = free
+        above_playable = playable[y]
+    return (isolated, borders)
+
+def shape(board: Bitboard, earned: int) -> float:
+    '''
+    Values the points earned, minus penalties for the holes and the jagged areas left on the board.
+    '''
+    (isolated, borders) = holes(board)
+    return earned - 4 * isolated - 0.5 * borders
+
+EVALUATIONS: dict[str, Evaluation] = {
+    'points': points,
+    'shape': shape,
+}
+
+
+class SearchInterrupted(Exception):
+    '''
+    Raised when a search is stopped before its end (see `Searcher.deadline` and `Searcher.stop`).
+    '''
+
+
+class Searcher:
+    '''
+    Searches the best move for a board and an offer. Keeps count of the moves it tried.
+    '''
+
+    def __init__(self, evaluation: Evaluation = shape, width: int = 1, depth: int = 1, cache: PlacementCache | None = None):
+        '''
+        :param evaluation: How the boards are valued.
+        :param width: How many boards are kept at each level of the search (1: greedy).
+        :param depth: How many moves are looked ahead.
+        :param cache: Where to look for the placements of the boards already searched, if anywhere.
+        '''
+        self.evaluation = evaluation
+        self.width = width
+        self.depth = depth
+        self.cache = cache
+        # When set, the search is interrupted once `time.perf_counter()` reaches the deadline, or once the event is set.
+        self.deadline: float | None = None
+        self.stop: threading.Event | None = None
+        # The number of moves tried, and the time spent searching, in seconds.
+        self.evaluated = 0
+        self.seconds = 0.0
+
+    def children(self, board: Bitboard, offered: list[Piece]) -> list[tuple[float, int, int, int, int]]:
+        '''
+        Tries every move on a board.
+
+        :param board: The board. It is modified while searching, but left as it was.
+        :param offered: The blocks to place.
+        :returns: The (value, points earned, block index, x, y) of every move.
+        '''
+        evaluation = self.evaluation
+        cache = self.cache
+        results = []
+        tried = set()
+        for (k, piece) in enumerate(offered):
+            # Offers often contain the same block several times.
+            if piece in tried:
+                continue
+            tried.add(piece)
+            if (self.deadline is not None and time.perf_counter() >= self.deadline) or (self.stop is not None and self.stop.is_set()):
+                raise SearchInterrupted()
+            value = block_value(piece)
+            for (x, y) in (cache.placements(board, piece) if cache else board.placements(piece)):
+                board.place(piece, x, y)
+                if not (board.row_candidates <= board.empty_rows and board.col_candidates <= board.empty_cols):
+                    # The move may clear lines, which can't be taken back: a copy is cleared instead.
+                    # The lines without playable cells are always candidates, but clearing them changes nothing.
+                    after = board.copy()
+                    (rows, cols, row_cells, col_cells) = clear_lines(after)
+                    earned = value + lines_score(len(rows), len(cols), row_cells, col_cells)
+                    results.append((evaluation(after, earned), earned, k, x, y))
+                else:
+                    results.append((evaluation(board, value), value, k, x, y))
+                board.remove(piece, x, y)
+        self.evaluated += len(results)
+        return results
+
+    def search(self, board: Bitboard, offered: list[Piece]) -> tuple[int, int, int] | None:
+        '''
+        :param board: The board. It is left as it was.
+        :param offered: The blocks offered.
+        :returns: The best (block index, x, y) move, or None if no block fits.
+        :raises SearchInterrupted: If the deadline passed or the search was stopped.
+        '''
+        start = time.perf_counter()
+        try:
+            # The beam: (points earned so far, board, first move).
+            beam = [(0, board, None)]
+            best = None
+            for level in range(self.depth):
+                candidates = []
+                for (n, (total, node, first)) in enumerate(beam):
+                    for (value, earned, k, x, y) in self.children(node, offered):
+                        candidates.append((total + value, n, earned, (k, x, y)))
+                if not candidates:
+                    # Every sequence is stuck, the best one of the previous level is kept.
+                    break
+                kept = heapq.nlargest(self.width, candidates, key=itemgetter(0))
+                (_, n, _, move) = kept[0]
+                best = beam[n][2] or move
+                if level + 1 < self.depth:
+                    next_beam = []
+                    for (_, n, earned, move) in kept:
+                        (total, node, first) = beam[n]
+                        after = node.copy()
+                        after.place(offered[move[0]], move[1], move[2])
+                        clear_lines(after)
+                        next_beam.append((total + earned, after, first or move))
+                    beam = next_beam
+        finally:
+            self.seconds += time.perf_counter() - start
+        return best
+
+
+def play_move(state: GameState, rng: random.Random, evaluation: Evaluation = shape, width: int = 1, depth: int = 1) -> tuple[int, int, int]:
+    '''
+    A policy (see `simulate.Policy`) playing the move found by a `Searcher`.
+    '''
+    return Searcher(evaluation, width, depth).search(state.board, state.offered)
+
+def beam_policy(width: int = 4, depth: int = 2, evaluation: str | Evaluation = 'shape') -> Callable[[GameState, random.Random], tuple[int, int, int]]:
+    '''
+    :param width: How many boards are kept at each level of the search (1: greedy).
+    :param depth: How many moves are looked ahead.
+    :param evaluation: The name of one of the `EVALUATIONS`, or an evaluation.
+    It must be a module-level function for the policy to be sent to other processes.
+    :returns: The policy.
+    '''
+    if isinstance(evaluation, str):
+        evaluation = EVALUATIONS[evaluation]
+    return partial(play_move, evaluation=evaluation, width=width, depth=depth)
+
+def play(state: GameState, searcher: Searcher, max_turns: int = 10_000) -> GameState:
+    '''
+    Plays a game until its end.
+
+    :param state: The game.
+    :param searcher: The search to use.
+    :param max_turns: The number of turns after which the game is stopped.
+    :returns: The game.
+    '''
+    while state.turn < max_turns:
+        state.offer()
+        if state.is_over():
+            return state
+        state.step(*searcher.search(state.board, state.offered))
+    state.end('max_turns')
+    return state
+
+def main() -> None:
+    from .constants import boards
+
+    parser = argparse.ArgumentParser(description='Lets a bot play Efreitris, to get reference scores.')
+    parser.add_argument('board', choices=['CIRCLE', 'DIAMOND', 'TRIANGLE', 'ALL'], type=str.upper)
+    parser.add_argument('size', choices=['SMALL', 'MEDIUM', 'LARGE', 'ALL'], type=str.upper)
+    parser.add_argument('-n', '--games', type=int, default=10)
+    parser.add_argument('-d', '--difficulty', type=int, choices=[1, 2], default=2, help='1: Easy, 2: Normal')
+    parser.add_argument('-e', '--evaluation', choices=list(EVALUATIONS), default='shape')
+    parser.add_argument('-W', '--width', type=int, default=1, help='the width of the beam (1: greedy)')
+    parser.add_argument('-D', '--depth', type=int, default=1, help='how many moves are looked ahead')
+    parser.add_argument('-s', '--seed', type=int, default=0)
+    parser.add_argument('--max-turns', type=int, default=10_000)
+    args = parser.parse_args()
+
+    for size in ['SMALL', 'MEDIUM', 'LARGE'] if args.size == 'ALL' else [args.size]:
+        for board_type in ['CIRCLE', 'DIAMOND', 'TRIANGLE'] if args.board == 'ALL' else [args.board]:
+            searcher = Searcher(EVALUATIONS[args.evaluation], args.width, args.depth)
+            results = []
+            for seed in range(args.seed, args.seed + args.games):
+                state = play(GameState(getattr(boards, f'{size}_{board_type}_BOARD'), board_type, args.difficulty, seed=seed),
+                             searcher, args.max_turns)
+                results.append(state)
+            scores = sorted(s.score for s in results)
+            rate = searcher.evaluated / searcher.seconds if searcher.seconds else 0
+            print(f'{size}_{board_type}: mean score {sum(scores) / len(scores):.1f}, median {scores[len(scores) // 2]}, '
+                  f'mean turns {sum(s.turn for s in results) / len(results):.1f}, {rate:,.0f} moves/s')
+
+if __name__ == '__main__':
+    main()
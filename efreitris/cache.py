@@ -0,0 +1,101 @@
+'''
+A bounded cache of the placements of pieces on boards, for the boards seen again and again
+(game over checks, hints and bots looking at the same position).
+
+Entries are keyed by the state of the board, not by the board object: the shape of the board, the Zobrist hash
+of its filled cells (see `Bitboard.zobrist`) and the piece. The hash is kept up to date by every change made to
+a Bitboard, so a board modified in place (placing a block, clearing lines) is looked up under its new state,
+and a board which goes back to a previous state finds its entry again.
+Two different states would need the same 64-bit hash to be confused.
+'''
+import sys
+from collections import OrderedDict
+
+from .bitboard import Bitboard
+from .pieces import Piece
+
+# The memory used by an entry without its placements (key, dictionary slot, tuple), and by each placement, in bytes.
+ENTRY_SIZE = sys.getsizeof((0, 0, None)) + sys.getsizeof(()) + 100
+PLACEMENT_SIZE = sys.getsizeof((0, 0)) + 8
+DEFAULT_MAX_BYTES = 32 << 20
+
+
+class PlacementCache:
+    '''
+    A least recently used cache of `Bitboard.placements`, with a memory cap.
+    '''
+
+    def __init__(self, max_bytes: int = DEFAULT_MAX_BYTES):
+        '''
+        :param max_bytes: The approximate memory the cached placements can use. The least recently used entries
+        are evicted beyond it.
+        '''
+        self.max_bytes = max_bytes
+        self.entries: OrderedDict[tuple[int, int, Piece], tuple[tuple[int, int], ...]] = OrderedDict()
+        # The approximate memory used by the entries, in bytes.
+        self.size = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def placements(self, board: Bitboard, piece: Piece) -> tuple[tuple[int, int], ...]:
+        '''
+        :param board: The board.
+        :param piece: The piece to place.
+        :returns: The valid (x, y) coordinates of the bottom left corner of the piece (see `Bitboard.placements`).
+        The tuple is shared with the cache.
+        '''
+        key = (board.shape, board.zobrist, piece)
+        entries = self.entries
+        result = entries.get(key)
+        if result is not None:
+            self.hits += 1
+            entries.move_to_end(key)
+            return result
+        self.misses += 1
+        result = tuple(board.placements(piece))
+        cost = ENTRY_SIZE + PLACEMENT_SIZE * len(result)
+        if cost > self.max_bytes:
+            return result
+        entries[key] = result
+        self.size += cost
+        while self.size > self.max_bytes:
+            (_, evicted) = entries.popitem(last=False)
+            self.size -= ENTRY_SIZE + PLACEMENT_SIZE * len(evicted)
+            self.evictions += 1
+        return result
+
+    def has_placement(self, board: Bitboard, piece: Piece) -> bool:
+        '''
+        :param board: The board.
+        :param piece: The piece to place.
+        :returns: Whether the piece can be placed anywhere. Unknown boards are checked without listing their placements.
+        '''
+        result = self.entries.get((board.shape, board.zobrist, piece))
+        if result is not None:
+            self.hits += 1
+            return len(result) > 0
+        return board.has_placement(piece)
+
+    def clear(self) -> None:
+        '''
+        Empties the cache. The counters are kept.
+        '''
+        self.entries.clear()
+        self.size = 0
+
+    def stats(self) -> dict[str, int]:
+        '''
+        :returns: The counters of the cache, its number of entries and its approximate size in bytes.
+        '''
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+            'evictions': self.evictions,
+            'entries': len(self.entries),
+            'bytes': self.size,
+        }
+
+
+# The cache used by `game.legal_placements` and `game.has_any_move`.
+placements_cache = PlacementCache()
@@ -0,0 +1,253 @@
+import os
+import sys
+from functools import lru_cache
+
+from .pieces import Piece, as_piece
+
+# ANSI escape sequences
+CLEAR = '\033[H\033[2J'
+CLEAR_LINE_END = '\033[K'
+CLEAR_SCREEN_END = '\033[J'
+
+_ansi = None
+
+
+def enable_ansi() -> bool:
+    '''
+    Makes sure the terminal interprets ANSI escape sequences. They are always supported on macOS / Linux,
+    while Windows consoles need to be switched to the "virtual terminal" mode first.
+
+    :returns: Whether ANSI escape sequences can be used.
+    '''
+    global _ansi
+    if _ansi is None:
+        _ansi = True
+        if os.name == 'nt':
+            try:
+                import ctypes
+                kernel32 = ctypes.windll.kernel32
+                handle = kernel32.GetStdHandle(-11) # The standard output
+                mode = ctypes.c_uint32()
+                # 0x0004: ENABLE_VIRTUAL_TERMINAL_PROCESSING
+                _ansi = bool(kernel32.GetConsoleMode(handle, ctypes.byref(mode))
+                             and kernel32.SetConsoleMode(handle, mode.value | 0x0004))
+            except (AttributeError, OSError):
+                _ansi = False
+    return _ansi
+
+def clear_screen():
+    '''
+    Clears the terminal.
+    '''
+    if enable_ansi():
+        sys.stdout.write(CLEAR)
+        sys.stdout.flush()
+    else: # For old Windows consoles
+        os.system('cls')
+
+def yesno_question(question: str) -> bool:
+    '''
+    Asks a yes/no question to the user.
+    :returns: The answer of the user. (True for yes, False for no)
+    '''
+    x = ''
+    while (x not in ['y', 'n', 'yes', 'no']):
+        x = input(f'{question} [y/n]: ').lower()
+    return x.startswith('y')
+
+def ask_position(board: list[list[int]]) -> tuple[int]:
+    '''
+    Asks the user where they want to place a block.
+
+    :param board: The board being used in the game. This allows the function to check whether the coordinates provided
+    by the user are out of bound.
+    :returns: The coordinates given by the user.
+    '''
+    x = y = -1
+    while x < 0 or y < 0 or x > len(board[0]) or y > len(board):
+        position = input('Where do you want to place it ? ')
+        if position.lower() in ['exit', 'quit','stop']:
+            return -1, -1
+        if len(position) != 2: 
+            continue
+        # Coordinates must be input like so: <xCoordinate><yCoordinate>
+        # The x coordinate being a lowercase letter and the y coordinate an uppercase letter.
+        x = ord(position[0]) - 97
+        y = ord(position[1]) - 65
+    return x, y
+
+def menu(options: list[str]) -> int:
+    '''
+    Lets the user choose among several options.
+
+    :param options: The options presented to the user.
+    :returns: An integer representing the option chosen by the user. **(starts at 1)**
+    '''
+    LENGTH = 28
+    print('╔' + '═'*LENGTH + '╗')
+    for i in range(len(options)):
+        opt = options[i]
+        # The -3 accounts for the length of the prefixing number.
+        space_len = (LENGTH - len(opt) - 3)//2
+        # In case the length of this line is odd, we make sure to keep the border aligned.
+        r = (LENGTH - len(opt) - 3) % 2
+        print('║' + ' '*space_len + str(i + 1) +'. ' + opt + ' '*(space_len + r) + '║')
+    print('╚' + '═'*LENGTH + '╝')
+    choice = -1
+    while (choice < 1 or choice > len(options)):
+        # The input might not be convertible into an int. Hence, we use a try-except block to avoid any crash.
+        try:
+            choice = int(input('Choice [1-' + str(len(options)) + ']: '))
+        except:
+            pass
+    return choice
+
+def board_lines(board: list[list[int]], test=False) -> list[str]:
+    '''
+    Renders a board in a readable format, with helpful side marks.
+
+    :param board: The board to render.
+    :param test: Whether to add the indexes of the rows and columns.
+    :returns: The lines of text of the board.
+    '''
+    alphabet = 'ABCDEFGHIJKLMNOPQRSTUVWXYZ'
+    top_letters = [alphabet[i].lower() for i in range(len(board[0]))]
+    chars = [' ', '□', '■']
+    lines = ['  ' + ' '.join(top_letters)]
+    for i in range(len(board)):
+        row = [ chars[x] for x in board[i] ]
+        lines.append(alphabet[i] + ' ' + ' '.join(row) + (f' {i}' if test else ''))
+
+    if test:
+        # We use modulo to avoid double digit numbers which would unalign the indexes.
+        bottom_numbers = [str(i % 10) for i in range(len(board[0]))]
+        lines.append('  ' + ' '.join(bottom_numbers))
+    return lines
+
+def display_board(board: list[list[int]], test=False) -> None:
+    '''
+    Displays a board in a readable format, with helpful side marks.
+
+    :param board: The board to display.
+    :param test: Whether to display the indexes of the rows and columns.
+    '''
+    sys.stdout.write('\n'.join(board_lines(board, test)) + '\n')
+
+@lru_cache(maxsize=None)
+def block_rows(piece: Piece, compact: bool = False) -> tuple[str, ...]:
+    '''
+    Renders a block once and for all (pieces are interned and immutable, so the result is cached).
+
+    :param piece: The piece to render.
+    :param compact: Whether to render the truncated block (see `truncate_block`) rather than its whole matrix.
+    :returns: The lines of text of the block, from top to bottom.
+    '''
+    chars = ['□','■']
+    if compact:
+        return tuple(' '.join([chars[mask >> l & 1] for l in range(piece.width)]) for mask in piece.masks)
+    return tuple(' '.join([chars[x] for x in row]) for row in piece.rows)
+
+@lru_cache(maxsize=None)
+def panel_borders(widths: tuple[int, ...]) -> tuple[str, str]:
+    '''
+    :param widths: The width of every block of a panel, in characters.
+    :returns: The top and bottom borders of the panel.
+    '''
+    return ('╔' + '╦'.join(['═' * (w + 2) for w in widths]) + '╗',
+            '╚' + '╩'.join(['═' * (w + 2) for w in widths]) + '╝')
+
+def blocks_lines(blocks: list[Piece] | list[list[list[int]]], compact: bool = False) -> list[str]:
+    '''
+    Renders a list of blocks side by side.
+
+    :param blocks: The set of blocks (or pieces) to render.
+    :param compact: Whether to render the truncated blocks, so that more of them fit in the terminal.
+    Blocks are then aligned on their bottom row, like they are placed.
+    :returns: The lines of text of the blocks.
+    '''
+    rendered = [block_rows(as_piece(block), compact) for block in blocks]
+    widths = tuple(len(rows[0]) for rows in rendered)
+    (top, bottom) = panel_borders(widths)
+    height = max(len(rows) for rows in rendered)
+    if compact:
+        rendered = [(' ' * w,) * (height - len(rows)) + rows for (w, rows) in zip(widths, rendered)]
+    lines = [top]
+    for i in range(height):
+        lines.append('║ ' + ' ║ '.join([rows[i] for rows in rendered]) + ' ║ ')
+    lines.append(bottom)
+    return lines
+
+def display_blocks(blocks: list[Piece] | list[list[list[int]]], compact: bool = False) -> None:
+    '''
+    Displays a list of blocks on the terminal.
+
+    :param blocks: The set of blocks (or pieces) to showcase.
+    :param compact: Whether to display the truncated blocks, so that more of them fit in the terminal.
+    '''
+    sys.stdout.write('\n'.join(blocks_lines(blocks, compact)) + '\n')
+
+
+class Renderer:
+    '''
+    Draws full-screen frames, each with a single write to the terminal.
+    Only the cells which changed since the previous frame are redrawn, by moving the cursor to them.
+    The lines printed below a frame (questions, answers...) are erased by the next one.
+    '''
+
+    def __init__(self, stream=None, reserved: int = 8):
+        '''
+        :param stream: Where the frames are written. Defaults to the standard output.
+        :param reserved: How many lines are kept free below a frame. If the terminal is too small for them,
+        typing could scroll the frame out of place, so every frame is drawn in full.
+        '''
+        self.stream = stream if stream is not None else sys.stdout
+        self.reserved = reserved
+        self.previous: list[str] | None = None
+
+    def reset(self) -> None:
+        '''
+        Forgets the previous frame, so that the next one is drawn in full.
+        Must be called whenever something else was displayed.
+        '''
+        self.previous = None
+
+    def draw(self, lines: list[str]) -> None:
+        '''
+        Draws a frame, and leaves the cursor on the line following it.
+
+        :param lines: The lines of text of the frame.
+        '''
+        if not enable_ansi():
+            clear_screen()
+            self.stream.write('\n'.join(lines) + '\n')
+            self.stream.flush()
+            return
+        # Imported on demand, as shutil takes a while to import.
+        import shutil
+        height = shutil.get_terminal_size().lines
+        previous = self.previous
+        if previous is None or len(lines) + self.reserved > height:
+            parts = [CLEAR, '\n'.join(lines), '\n']
+        else:
+            parts = []
+            for (y, line) in enumerate(lines):
+                old = previous[y] if y < len(previous) else ''
+                if line == old:
+                    continue
+                # Only the span between the common prefix and the common suffix of the two lines is rewritten.
+                start = 0
+                end = min(len(line), len(old))
+                while start < end and line[start] == old[start]:
+                    start += 1
+                stop = len(line)
+                if len(line) == len(old):
+                    while stop > start and line[stop - 1] == old[stop - 1]:
+                        stop -= 1
+                # Cursor positions start at 1.
+                parts.append(f'\033[{y + 1};{start + 1}H{line[start:stop]}')
+                if len(line) < len(old):
+                    parts.append(CLEAR_LINE_END)
+            parts.append(f'\033[{len(lines) + 1};1H{CLEAR_SCREEN_END}')
+        self.stream.write(''.join(parts))
+        self.stream.flush()
+        self.previous = lines
\ No newline at end of file
@@ -0,0 +1,276 @@
+from .bitboard import Bitboard, in_bounds, row_masks
+from .cache import placements_cache
+from .pieces import Piece, as_piece
+from .saves import DEFAULT_SLOT, CorruptedSaveError, read_save, write_save
+
+
+def actual_size(block: list[list[int]]) -> tuple[int, int]:
+    """
+    Returns the actual size of a given block rather than the size of the matrix it's stored in.
+    For example, a 2x1 block stored in a 3x3 matrix (e.g. Triangle's Horizontal Small I).
+    
+    :param block: The block to get the size of.
+    :returns: The actual size of the specified block.
+	"""
+    width = 0
+    # Since a block starts from the bottom, 
+    # we deduce the actual height from the first row in which there's a square (so technically, the value 1) 
+    start = -1
+    for i in range(len(block)):
+        row = block[i]
+        # This represents the actual width in the current row
+        w = 0
+        for j in range(len(row)):
+            val = row[j]
+            if val == 1:
+                # If we find a 1 at index j, then the currently presumed width is j + 1, since array indexes start at 0. 
+                 w = j + 1
+                 if start == -1: 
+                      # If this is the first 1 we find, the current row is the top row of the actual block.
+                      start = i
+            # If the actual width of the current row is the biggest we have found so far,
+            # it becomes the presumed width of the block 
+            if w > width:
+                 width = w
+    height = len(block) - start
+    return (width, height)
+
+def truncate_block(block: list[list[int]]) -> list[list[int]]:
+    """
+    Returns the 2d matrix of a block in its actual size rather than the size it's stored in.
+    :param block: The block to truncate.
+    :returns: The truncated block.
+    """
+    (x,y) = actual_size(block)
+    start = len(block) - y
+    truncated = []
+    for i in range(start, len(block)):
+        truncated.append([])
+        row = block[i]
+        for j in range(x):
+            truncated[-1].append(row[j])
+    return truncated
+
+def block_value(block: list[list[int]] | Piece) -> int:
+    """
+    Returns how many points placing a block is worth.
+
+    :param block: The block or its piece.
+    :returns: The value of the block.
+    """
+    return as_piece(block).value
+
+def valid_position(grid: list[list[int]] | Bitboard, block: list[list[int]] | Piece, i: int, j: int) -> bool: 
+    """
+    Checks whether the block `block` can be placed on the slot of coordinates (i,j) on the grid `grid`.
+    
+    :param grid: The grid in use.
+    :param block: The block which is being attempted to place.
+    :param i: The x coordinate of the block on the grid.
+    :param j: The y coordinate of the block on the grid (from the bottom of the block).
+    :returns: Whether the block can be placed on the grid at (i,j).
+    """
+    piece = as_piece(block)
+    if isinstance(grid, Bitboard):
+        return grid.fits(piece, i, j)
+    masks = piece.masks
+    # First of all we check if the block can be contained in the grid at this position,
+    # only depending on the size of the whole grid and the block.
+    if not in_bounds(len(grid[0]), len(grid), piece.width, piece.height, i, j):
+        return False
+    # Only the rows covered by the block are converted into masks.
+    # j references the bottom of the block, while the masks are going from top to bottom.
+    y = j - len(masks) + 1
+    for mask in masks:
+        (playable, filled) = row_masks(grid[y])
+        mask <<= i
+        # Every square of the block needs a free cell: playable (1 or 2) but not filled (2).
+        if mask & (playable ^ filled) != mask:
+            return False
+        y += 1
+    # If we didn't return False earlier, the block can be placed. 
+    return True
+
+def place_block(grid: list[list[int]] | Bitboard, block: list[list[int]] | Piece, i: int, j: int) -> bool: 
+    """
+    Places a block in the grid. (Modifies the given matrix in-place)
+
+    :param grid: The grid in which the place is placed.
+    :param block: The block to place.
+    :param i: The x coordinate of the block on the grid.
+    :param j: The y coordinate of the block on the grid (from the bottom of the block).
+    :returns: Whether the block was successfully placed.
+    """
+    piece = as_piece(block)
+    if isinstance(grid, Bitboard):
+        return grid.place(piece, i, j)
+    if not valid_position(grid, piece, i, j):
+        return False
+    for (dx, dy) in piece.cells:
+        grid[j + dy][i + dx] = 2
+    return True
+
+def legal_placements(board: list[list[int]] | Bitboard, block: list[list[int]] | Piece) -> list[tuple[int, int]]:
+    """
+    Lists every slot of the board on which the block can be placed, in one pass.
+    
+    :param board: The board in use.
+    :param block: The block to place.
+    :returns: The (x, y) coordinates accepted by `valid_position`, from the top row to the bottom one.
+    """
+    if not isinstance(board, Bitboard):
+        board = Bitboard(board)
+    # The placements of boards seen before are cached (see `cache.PlacementCache`).
+    return list(placements_cache.placements(board, as_piece(block)))
+
+def has_any_move(board: list[list[int]] | Bitboard, offered_blocks: list[list[list[int]]] | list[Piece]) -> bool:
+    """
+    Checks whether at least one of the offered blocks can be placed somewhere on the board.
+    
+    :param board: The board in use.
+    :param offered_blocks: The blocks the player can choose from.
+    :returns: Whether the game can go on. Stops at the first block that fits.
+    """
+    if not isinstance(board, Bitboard):
+        board = Bitboard(board)
+    for block in offered_blocks:
+        if placements_cache.has_placement(board, as_piece(block)):
+            return True
+    return False
+
+def row_state(grid: list[list[int]] | Bitboard, i: int) -> bool:
+    """
+    Verifies if the row `i` in the grid `grid` is full.
+
+    :param grid: The grid to use.
+    :param i: The index of the row to verify.
+    :returns: Whether the row is full.
+    """
+    if isinstance(grid, Bitboard):
+        return grid.row_full(i)
+    return 1 not in grid[i]
+
+def col_state(grid: list[list[int]] | Bitboard, i: int) -> bool:
+    """
+    Verifies if the column `i` in the grid `grid` is full.
+    
+    :param grid: The grid to use.
+    :param i: The index of the column to verify.
+    :returns: Whether the column is full.
+    """
+    if isinstance(grid, Bitboard):
+        return grid.col_full(i)
+    for row in grid:
+        if row[i] == 1:
+            return False
+    return True
+
+def clear_col(grid: list[list[int]] | Bitboard, i: int) -> int:
+    """
+    Clears the `i` column in the `grid`. Modifies the provided grid **in-place**.
+    
+    :param grid: The grid to use.
+    :param i: The index of the column to clear.
+    :returns: How many cells were cleared.
+    """
+    if isinstance(grid, Bitboard):
+        return grid.clear_col(i)
+    cleared = 0
+    for j in range(len(grid)):
+       if grid[j][i] == 2:
+            cleared+=1
+            grid[j][i] = 1
+    return cleared
+
+def clear_row(grid: list[list[int]] | Bitboard, i: int) -> int:
+    """
+    Clears the `i` row in the `grid` and makes the remaining rows fall down. Modifies the provided grid **in-place**.
+    :param grid: The grid to use.
+    :param i: The index of the row to clear.
+    :returns: How many cells were cleared.
+    """
+    if isinstance(grid, Bitboard):
+        return grid.clear_row(i)
+    cleared = grid[i].count(2)
+    # Each row, from the cleared one to the top, takes the filled cells of the row above it.
+    # A non-playable square (0) stays as it is, and a filled square falling on it is lost.
+    for y in range(i, 0, -1):
+        above = grid[y - 1]
+        grid[y][:] = [square and 1 + (fallen == 2) for (square, fallen) in zip(grid[y], above)]
+    # Finally, we clear the top row, respecting the shape of the board.
+    grid[0][:] = [square and 1 for square in grid[0]]
+    return cleared
+
+def clear_lines(grid: list[list[int]] | Bitboard) -> tuple[list[int], list[int], int, int]:
+    """
+    Clears every full row, then every full column of the grid. Modifies the provided grid **in-place**.
+    Rows are cleared from the top to the bottom, before the columns are checked.
+
+    :param grid: The grid to use.
+    :returns: A tuple containing:
+        - list[int]: The indexes of the cleared rows.
+        - list[int]: The indexes of the cleared columns.
+        - int: How many cells were cleared by the rows.
+        - int: How many cells were cleared by the columns.
+    """
+    if isinstance(grid, Bitboard):
+        return grid.clear_lines()
+    rows = []
+    cols = []
+    row_cells = 0
+    col_cells = 0
+    for i in range(len(grid)):
+        if row_state(grid, i):
+            row_cells += clear_row(grid, i)
+            rows.append(i)
+    for j in range(len(grid[0])):
+        if col_state(grid, j):
+            col_cells += clear_col(grid, j)
+            cols.append(j)
+    return (rows, cols, row_cells, col_cells)
+
+def lines_score(cleared_rows: int, cleared_cols: int, row_cells: int, col_cells: int) -> int:
+    """
+    Computes the points earned by clearing lines in a single move.
+
+    :param cleared_rows: How many rows were cleared.
+    :param cleared_cols: How many columns were cleared.
+    :param row_cells: How many cells were cleared by the rows.
+    :param col_cells: How many cells were cleared by the columns.
+    :returns: The points earned.
+    """
+    # Each cleared cell is worth 3 points, and the cells of the columns are multiplied by the number of columns.
+    total = col_cells * 3 * cleared_cols + row_cells * 3 + cleared_rows
+    # Clearing rows and columns at the same time is a combo!
+    if cleared_cols != 0 and cleared_rows != 0:
+        total *= min(cleared_cols, cleared_rows) * 2
+    return total
+
+def fetch_save(slot: str = DEFAULT_SLOT) -> tuple[int, int, str, list[list[int]]] | bool:
+    '''
+    Fetches data from a save file, if it exists. A corrupted save file is left untouched.
+    :param slot: The name of the save slot.
+    :returns: A tutple containing the following saved data:
+        - int: The score of the game.
+        - int: The difficulty of the game.
+        - str: The type of board.
+        - list[list[int]]: The state of the board.
+        Or a boolean: False if the file just doesn't exist, True if it was corrupted.
+    '''
+    try:
+        saved = read_save(slot)
+    except CorruptedSaveError:
+        return True
+    return saved if saved is not None else False
+
+
+def save_game(score:int , difficulty: int, board_type: str, board: list[list[int]] | Bitboard, slot: str = DEFAULT_SLOT) -> None:
+    '''
+    Saves the game in a save slot (by default, the `~SAVE` file).
+    :param score: The score of the game.
+    :param difficulty: The difficulty of the game.
+    :param board_type: The type of board used.
+    :param board: The state of the board.
+    :param slot: The name of the save slot.
+    '''
+    write_save(score, difficulty, board_type, board, slot)
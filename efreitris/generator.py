@@ -0,0 +1,126 @@
+'''
+Block generators: draw the blocks offered to the player, from a random generator seeded for each game.
+
+The pool of each type of board, difficulty and weights is built once (see `board_pool`): the blocks which can be offered,
+and their weights. The weights and the mode of a game are given to `state.GameState` (or `python -m efreitris.simulate
+--weights ... --bag`), and recorded in its journal. A generator draws a whole offer in one call, in one of two modes:
+- independently: each block is drawn with a probability proportional to its weight. With the default weights (all 1),
+  the blocks drawn from a seed are exactly the ones of the previous versions of the game, so journals still replay.
+- from a bag: each block is put in the bag as many times as its weight, the bag is shuffled and the blocks are dealt
+  from it, and a new bag is started once it is empty. Every block then shows up regularly.
+The constant tables of blocks are never modified.
+'''
+import random
+from functools import lru_cache
+from itertools import accumulate
+
+from . import pieces
+from .pieces import Piece
+
+
+def board_pieces(board_type: str) -> tuple[Piece, ...]:
+    '''
+    :param board_type: The type of board (CIRCLE, DIAMOND or TRIANGLE).
+    :returns: The pieces specific to this type of board.
+    '''
+    return getattr(pieces, f'{board_type}_PIECES')
+
+
+class Pool:
+    '''
+    The blocks which can be offered, with their weights. Everything needed to draw from it is computed once.
+
+    - `pieces`: The blocks. Offers are given as indexes in this tuple.
+    - `weights`: The weight of each block.
+    - `cum_weights`: The cumulative weights, as taken by `random.choices`.
+    - `bag`: The content of a full bag: the index of each block, as many times as its weight.
+    - `uniform`: Whether all the weights are the same.
+    '''
+    __slots__ = ('pieces', 'weights', 'cum_weights', 'bag', 'uniform')
+
+    def __init__(self, blocks: tuple[Piece, ...], weights: tuple[int, ...] | None = None):
+        '''
+        :param blocks: The blocks.
+        :param weights: The weight of each block, 1 for all of them by default.
+        :raises ValueError: If the weights don't match the blocks, or aren't positive.
+        '''
+        weights = tuple(weights) if weights is not None else (1,) * len(blocks)
+        if len(weights) != len(blocks) or not blocks or min(weights) < 1:
+            raise ValueError('a pool needs at least one block, and a positive weight for each of them')
+        self.pieces = tuple(blocks)
+        self.weights = weights
+        self.cum_weights = tuple(accumulate(weights))
+        self.bag = tuple(k for (k, weight) in enumerate(weights) for _ in range(weight))
+        self.uniform = len(set(weights)) == 1
+
+    def __len__(self) -> int:
+        return len(self.pieces)
+
+    def __repr__(self) -> str:
+        return f'Pool({len(self.pieces)} blocks, weights={self.weights})'
+
+
+@lru_cache(maxsize=None)
+def board_pool(board_type: str, difficulty: int, weights: tuple[int, ...] | None = None) -> Pool:
+    '''
+    :param board_type: The type of board (CIRCLE, DIAMOND or TRIANGLE).
+    :param difficulty: The difficulty of the game (1: Easy, 2: Normal).
+    :param weights: The weight of each block of the pool, 1 for all of them by default.
+    :returns: The pool of the games on this board. In easy mode, the blocks of the board are offered
+    in addition to the common ones.
+    '''
+    blocks = pieces.COMMON_PIECES + board_pieces(board_type) if difficulty == 1 else pieces.COMMON_PIECES
+    return Pool(blocks, weights)
+
+
+class BlockGenerator:
+    '''
+    Draws the offers of one game. Its draws only depend on its pool, its seed and its mode.
+    '''
+
+    def __init__(self, pool: Pool, seed: int | None = None, bag: bool = False):
+        '''
+        :param pool: The blocks to draw from.
+        :param seed: The seed of the random generator. A random one is picked if it isn't given.
+        :param bag: Whether to deal the blocks from a shuffled bag instead of drawing them independently.
+        '''
+        self.pool = pool
+        self.seed = seed if seed is not None else random.getrandbits(63)
+        self.rng = random.Random(self.seed)
+        # The blocks left in the bag, dealt from the end (None when the blocks are drawn independently).
+        self.bag: list[int] | None = [] if bag else None
+
+    def offer(self, size: int) -> list[int]:
+        '''
+        :param size: The number of blocks of the offer.
+        :returns: The indexes of the offered blocks in the pool.
+        '''
+        pool = self.pool
+        rng = self.rng
+        if self.bag is None:
+            if pool.uniform:
+                n = len(pool.pieces)
+                return [rng.randrange(n) for _ in range(size)]
+            return rng.choices(range(len(pool.pieces)), cum_weights=pool.cum_weights, k=size)
+        bag = self.bag
+        indexes = []
+        while len(indexes) < size:
+            if not bag:
+                bag.extend(pool.bag)
+                rng.shuffle(bag)
+            take = min(size - len(indexes), len(bag))
+            indexes += bag[:-take - 1:-1]
+            del bag[-take:]
+        return indexes
+
+    def copy(self) -> 'BlockGenerator':
+        '''
+        :returns: A generator which will draw the same offers as this one, without advancing it.
+        '''
+        other = BlockGenerator.__new__(BlockGenerator)
+        other.pool = self.pool
+        other.seed = self.seed
+        other.rng = random.Random()
+        other.rng.setstate(self.rng.getstate())
+        other.bag = None if self.bag is None else list(self.bag)
+        return other
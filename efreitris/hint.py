@@ -0,0 +1,83 @@
+'''
+Hints: the best move for the current offer, searched in the background while the player is thinking.
+
+The search starts as soon as the turn is drawn, in a thread working on a copy of the board, and deepens
+(see `bot.Searcher`) until its deadline: asking for the hint returns the best move found so far, right away.
+Starting a hint costs a copy of the board, and a search waiting for the player uses no CPU once it is done.
+'''
+import threading
+import time
+
+from .bitboard import Bitboard
+from .bot import Evaluation, SearchInterrupted, Searcher, shape
+from .pieces import Piece
+
+# How long a hint is searched for, in seconds.
+DEFAULT_SECONDS = 3.0
+# The width of the beam, and the deepest search tried.
+WIDTH = 4
+MAX_DEPTH = 3
+
+
+class Hint:
+    '''
+    A search running in the background. Always cancel it once the move is played.
+    '''
+
+    def __init__(self, board: Bitboard, offered: list[Piece], seconds: float = DEFAULT_SECONDS, evaluation: Evaluation = shape):
+        '''
+        Starts the search.
+
+        :param board: The board. It is copied, so it can be modified while the search runs.
+        :param offered: The blocks offered.
+        :param seconds: How long to search for at most.
+        :param evaluation: How the boards are valued.
+        '''
+        self.board = board.copy()
+        self.offered = list(offered)
+        self.evaluation = evaluation
+        self.deadline = time.perf_counter() + seconds
+        self.stop = threading.Event()
+        # The best (block index, x, y) move found, and the depth of the search which found it (0 while there is none).
+        self.move: tuple[int, int, int] | None = None
+        self.depth = 0
+        self.done = threading.Event()
+        self.thread = threading.Thread(target=self._run, name='efreitris-hint', daemon=True)
+        self.thread.start()
+
+    def _run(self) -> None:
+        try:
+            for depth in range(1, MAX_DEPTH + 1):
+                searcher = Searcher(self.evaluation, WIDTH, depth)
+                # The first search always completes, so that there is a move to give.
+                if depth > 1:
+                    searcher.deadline = self.deadline
+                    searcher.stop = self.stop
+                elif self.stop.is_set():
+                    return
+                move = searcher.search(self.board, self.offered)
+                if move is None:
+                    return
+                (self.move, self.depth) = (move, depth)
+        except SearchInterrupted:
+            pass
+        finally:
+            self.done.set()
+
+    def result(self, timeout: float = 1.0) -> tuple[int, int, int] | None:
+        '''
+        :param timeout: How long to wait for a first move, if none was found yet.
+        :returns: The best (block index, x, y) move found so far, or None if no block fits.
+        '''
+        if self.move is None:
+            # The first search is fast, and only runs on the offered blocks.
+            deadline = time.perf_counter() + timeout
+            while self.move is None and not self.done.is_set() and time.perf_counter() < deadline:
+                self.done.wait(0.01)
+        return self.move
+
+    def cancel(self) -> None:
+        '''
+        Stops the search.
+        '''
+        self.stop.set()
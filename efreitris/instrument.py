@@ -0,0 +1,265 @@
+'''
+Opt-in instrumentation of the hot paths, to find out where the time of a turn goes.
+
+When enabled (with `enable`, the `EFREITRIS_PROFILE=1` environment variable or `python -m efreitris --profile`),
+the functions of `game`, the moves of `state.GameState` and the renderers of `display` are replaced by wrappers
+counting their calls and their time, and the time spent waiting for the player's input is measured too.
+When it isn't, nothing is wrapped and the game runs exactly as usual.
+Enabling it doesn't import anything: the modules imported later on (like `hint`) are instrumented once imported.
+
+Time is split between four categories: 'engine', 'render', 'think' (the player typing) and 'hint' (the search of the
+hint, in its own thread while the player thinks). Nested calls are only counted once, in the category of the outermost
+one: the engine working for the hint is counted in 'hint'. Each thread keeps track of its own calls.
+A call is counted when it starts, and its time goes to the turn it started in, even if it ends during the next one.
+'''
+import builtins
+import functools
+import importlib
+import os
+import sys
+import threading
+import time
+from collections.abc import Callable
+
+ENV_VAR = 'EFREITRIS_PROFILE'
+CATEGORIES = ['engine', 'render', 'think', 'hint']
+# The functions instrumented, by category: (module, names), the names being attributes of the module.
+# Every function defined in `game` is instrumented.
+TARGETS = {
+    'engine': [
+        ('efreitris.game', None),
+        ('efreitris.state', ['GameState.offer', 'GameState.step', 'GameState.can_place', 'GameState.placements_available']),
+    ],
+    'render': [
+        ('efreitris.display', ['board_lines', 'blocks_lines', 'display_board', 'display_blocks', 'clear_screen', 'Renderer.draw']),
+    ],
+    'hint': [
+        ('efreitris.hint', ['Hint._run']),
+    ],
+}
+
+
+class Counter:
+    '''
+    The calls to an instrumented function.
+    '''
+    __slots__ = ('calls', 'ns')
+
+    def __init__(self):
+        self.calls = 0
+        # The total time spent in the function, in nanoseconds.
+        self.ns = 0
+
+    def __repr__(self) -> str:
+        return f'Counter(calls={self.calls}, ns={self.ns})'
+
+
+# Whether the instrumentation is enabled.
+active = False
+# The counters of the instrumented functions, by qualified name (e.g. 'game.clear_lines').
+counters: dict[str, Counter] = {}
+# The time spent in each category since the instrumentation was enabled, and during the current turn, in nanoseconds.
+totals = dict.fromkeys(CATEGORIES, 0)
+turn = dict.fromkeys(CATEGORIES, 0)
+# The time spent in each category during every finished turn.
+turns: list[dict[str, int]] = []
+
+# The category of the outermost instrumented call running in each thread (None when there is none).
+_running = threading.local()
+# The replaced functions: (class or None for module-level functions, name, original, wrapper).
+_replaced: list[tuple[type | None, str, Callable, Callable]] = []
+# The modules of `TARGETS` which weren't imported yet when the instrumentation was enabled.
+_pending: set[str] = set()
+
+
+def _wrap(name: str, category: str, func: Callable) -> Callable:
+    counter = counters.setdefault(name, Counter())
+    clock = time.perf_counter_ns
+
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        outermost = getattr(_running, 'category', None) is None
+        if outermost:
+            _running.category = category
+        counter.calls += 1
+        # `end_turn` starts a new dict for the next turn, so this one stays the turn of the call.
+        current = turn
+        start = clock()
+        try:
+            return func(*args, **kwargs)
+        finally:
+            elapsed = clock() - start
+            counter.ns += elapsed
+            if outermost:
+                _running.category = None
+                current[category] += elapsed
+                totals[category] += elapsed
+    return wrapper
+
+def _replace(old: Callable, new: Callable) -> None:
+    '''
+    Replaces a function everywhere it was imported in the package, so that every caller goes through `new`.
+    '''
+    for (name, module) in list(sys.modules.items()):
+        if module is None or not (name == 'efreitris' or name.startswith('efreitris.')):
+            continue
+        for (attr, value) in list(vars(module).items()):
+            if value is old:
+                setattr(module, attr, new)
+
+def _instrument(module_name: str) -> None:
+    '''
+    Instruments the targets of an imported module (see `TARGETS`).
+    '''
+    module = sys.modules[module_name]
+    for (category, targets) in TARGETS.items():
+        for (target, names) in targets:
+            if target != module_name:
+                continue
+            if names is None:
+                names = [n for (n, v) in vars(module).items() if callable(v) and getattr(v, '__module__', None) == module_name
+                         and not isinstance(v, type)]
+            for name in names:
+                (cls, _, attr) = name.rpartition('.')
+                cls = getattr(module, cls) if cls else None
+                func = vars(cls)[attr] if cls else getattr(module, attr)
+                wrapper = _wrap(f'{module_name.rpartition(".")[2]}.{name}', category, func)
+                if cls:
+                    setattr(cls, attr, wrapper)
+                else:
+                    _replace(func, wrapper)
+                _replaced.append((cls, attr, func, wrapper))
+
+
+class _Finder:
+    '''
+    Instruments the modules of `TARGETS` imported after the instrumentation was enabled, right after they are executed.
+    Installed in `sys.meta_path` while some are left.
+    '''
+
+    @classmethod
+    def find_spec(cls, name: str, path, target=None):
+        if name not in _pending:
+            return None
+        # The module is found by the other finders, and only its execution is followed.
+        sys.meta_path.remove(cls)
+        try:
+            spec = importlib.util.find_spec(name)
+        finally:
+            sys.meta_path.insert(0, cls)
+        if spec is not None and spec.loader is not None:
+            spec.loader = _Loader(spec.loader)
+        return spec
+
+
+class _Loader:
+    '''
+    Executes a module with its own loader, then instruments it.
+    '''
+
+    def __init__(self, loader):
+        self.loader = loader
+
+    def create_module(self, spec):
+        return self.loader.create_module(spec)
+
+    def exec_module(self, module) -> None:
+        self.loader.exec_module(module)
+        _pending.discard(module.__name__)
+        if not _pending and _Finder in sys.meta_path:
+            sys.meta_path.remove(_Finder)
+        if active:
+            _instrument(module.__name__)
+
+
+def enable() -> None:
+    '''
+    Instruments the hot paths. Does nothing if they already are.
+    The modules which aren't imported yet are instrumented when they are, rather than imported now.
+    '''
+    global active
+    if active:
+        return
+    for module_name in dict.fromkeys(target for targets in TARGETS.values() for (target, _) in targets):
+        if module_name in sys.modules:
+            _instrument(module_name)
+        else:
+            _pending.add(module_name)
+    if _pending:
+        # Imported on demand, as only the instrumentation needs it.
+        import importlib.util
+        sys.meta_path.insert(0, _Finder)
+    wrapper = _wrap('input', 'think', builtins.input)
+    _replaced.append((None, 'input', builtins.input, wrapper))
+    builtins.input = wrapper
+    active = True
+
+def disable() -> None:
+    '''
+    Puts the original functions back. The counters are kept.
+    '''
+    global active
+    if not active:
+        return
+    _pending.clear()
+    if _Finder in sys.meta_path:
+        sys.meta_path.remove(_Finder)
+    for (cls, attr, func, wrapper) in _replaced:
+        if cls:
+            setattr(cls, attr, func)
+        elif wrapper is builtins.input:
+            builtins.input = func
+        else:
+            _replace(wrapper, func)
+    _replaced.clear()
+    active = False
+
+def enabled_by_environment() -> bool:
+    '''
+    :returns: Whether the environment asks for the instrumentation.
+    '''
+    return os.environ.get(ENV_VAR, '') not in ['', '0']
+
+def reset() -> None:
+    '''
+    Sets every counter back to 0.
+    '''
+    for counter in counters.values():
+        counter.calls = counter.ns = 0
+    for category in CATEGORIES:
+        totals[category] = turn[category] = 0
+    turns.clear()
+
+def end_turn() -> dict[str, int]:
+    '''
+    Closes the current turn.
+
+    :returns: The time spent in each category during the turn, in nanoseconds. The calls still running
+    (like the search of the hint) add their time to it when they end.
+    '''
+    global turn
+    finished = turn
+    turns.append(finished)
+    turn = dict.fromkeys(CATEGORIES, 0)
+    return finished
+
+def format_turn(times: dict[str, int]) -> str:
+    '''
+    :param times: The time spent in each category during a turn.
+    :returns: A one-line breakdown of the turn.
+    '''
+    return ', '.join(f'{category} {times[category] / 1e6:.2f} ms' for category in CATEGORIES)
+
+def summary(top: int = 15) -> list[str]:
+    '''
+    :param top: How many functions to list.
+    :returns: The lines of the breakdown of the time since the instrumentation was enabled.
+    '''
+    lines = [f'{len(turns)} turns: ' + format_turn(totals)]
+    if turns:
+        lines.append('Per turn: ' + format_turn({c: totals[c] // len(turns) for c in CATEGORIES}))
+    lines.append(f'{"function":<36} {"calls":>9} {"total ms":>10} {"µs/call":>9}')
+    for (name, counter) in sorted(counters.items(), key=lambda item: -item[1].ns)[:top]:
+        if counter.calls:
+            lines.append(f'{name:<36} {counter.calls:>9} {counter.ns / 1e6:>10.2f} {counter.ns / counter.calls / 1e3:>9.1f}')
+    return lines
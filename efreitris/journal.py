@@ -0,0 +1,385 @@
+'''
+Game journals: compact, append-only records of every move of a game, from which the game can be replayed exactly.
+
+A journal starts with a header: the magic bytes, the version of the format, the seed of the game, how its blocks are drawn
+(whether from a bag, and the weights of the pool unless they are the default ones, see `generator`) and the initial state
+of the game, in the save format (see `saves`). Then comes one fixed-width record per move:
+the indexes of the offered blocks in the pool (0xFF for unused entries), the index of the chosen block, x and y.
+
+A journal can have an index next to it (same path, with `.idx` appended), holding a snapshot of the game every N moves:
+the turn, the score, the state of the random generator, the blocks left in the bag (when the blocks are dealt from one)
+and the packed board (see `saves.pack_cells`).
+Seeking to any turn then only replays the moves since the previous snapshot.
+The index is tied to its journal: its header holds the seed and the CRC-32 of the header of the journal, and each snapshot
+the CRC-32 of the journal up to its move. The snapshots which don't match the journal are ignored, and the moves replayed.
+'''
+import os
+import struct
+import zlib
+from collections import namedtuple
+
+from .generator import board_pool
+from .saves import CorruptedSaveError, decode, encode, pack_cells, unpack_cells
+from .state import GameState
+
+MAGIC = b'EFTJ'
+VERSION = 2
+# magic, version, seed, length of the initial state
+HEADER = struct.Struct('<4sBQI')
+# Since the version 2, between the header and the initial state: whether the blocks are dealt from a bag, and the number
+# of weights of the pool which follow, on 2 bytes each (0 for the default weights). The version 1 had neither.
+DRAWS = struct.Struct('<BH')
+MAX_OFFER = 10
+# offered block indexes, chosen block, x, y
+RECORD = struct.Struct(f'<{MAX_OFFER}sBHH')
+UNUSED = 0xFF
+INDEX_MAGIC = b'EFTK'
+INDEX_VERSION = 2
+# magic, version, interval between snapshots, height, width, seed of the journal, CRC-32 of the header of the journal
+INDEX_HEADER = struct.Struct('<4sBIHHQI')
+# turn, CRC-32 of the journal up to this turn, score, state of the Mersenne Twister (624 words and the position)
+SNAPSHOT = struct.Struct('<IIQ625I')
+# When the blocks are dealt from a bag, after the snapshot: the number of blocks left in the bag, then these blocks,
+# padded with 0xFF to the size of a full bag.
+BAG = struct.Struct('<H')
+DEFAULT_INTERVAL = 100
+# Where the game being played is journaled, to reproduce it when reporting a bug.
+DEFAULT_PATH = '~JOURNAL'
+
+
+class JournalError(ValueError):
+    '''
+    Raised when a journal can't be read, or when replaying it doesn't give the recorded game.
+    '''
+
+
+class Move(namedtuple('Move', ['offered', 'block_index', 'x', 'y'])):
+    '''
+    A recorded move: the indexes of the offered blocks in the pool (`offered`), the index of the chosen block among them
+    (`block_index`), and its position (`x`, `y`).
+    '''
+    __slots__ = ()
+
+
+class JournalWriter:
+    '''
+    Records the moves of a game in a journal file. Writes are buffered, so recording a move costs next to nothing.
+    Attach it to a game with `state.journal = JournalWriter(path, state)`, and close it when the game ends.
+    '''
+
+    def __init__(self, path: str, state: GameState, buffer_size: int = 1 << 16, interval: int | None = DEFAULT_INTERVAL):
+        '''
+        :param path: The path of the journal file, which is replaced if it exists.
+        :param state: The game to record, before its first move is played.
+        :param buffer_size: How many bytes are kept in memory before being written.
+        :param interval: How many moves are played between two snapshots of the index. None to write no index.
+        '''
+        self.file = open(path, 'wb', buffering=buffer_size)
+        initial = encode(state.score, state.difficulty, state.board_type, state.board)
+        weights = state.generator.pool.weights
+        if all(weight == 1 for weight in weights):
+            weights = ()
+        draws = DRAWS.pack(state.generator.bag is not None, len(weights)) + struct.pack(f'<{len(weights)}H', *weights)
+        header = HEADER.pack(MAGIC, VERSION, state.seed, len(initial)) + draws + initial
+        self.file.write(header)
+        # The CRC-32 of everything written in the journal, stored in the snapshots.
+        self.crc = zlib.crc32(header)
+        self.interval = interval
+        self.index = None
+        if interval is not None:
+            self.index = open(index_path(path), 'wb', buffering=buffer_size)
+            self.index.write(index_header(interval, state.board.height, state.board.width, state.seed, self.crc))
+        else:
+            # The index of a previous journal would not match this one.
+            try:
+                os.remove(index_path(path))
+            except FileNotFoundError:
+                pass
+
+    def record(self, state: GameState, block_index: int, x: int, y: int) -> None:
+        '''
+        Appends a move to the journal. Called by the game once the move has been played.
+
+        :param state: The game, after the move.
+        :param block_index: The index of the chosen block in the offer.
+        :param x: The x coordinate of the block on the board.
+        :param y: The y coordinate of the block on the board (from the bottom of the block).
+        '''
+        record = RECORD.pack(bytes(state.offered_indexes).ljust(MAX_OFFER, b'\xff'), block_index, x, y)
+        self.file.write(record)
+        self.crc = zlib.crc32(record, self.crc)
+        if self.index is not None and state.turn % self.interval == 0:
+            self.index.write(snapshot(state, self.crc))
+
+    def flush(self) -> None:
+        self.file.flush()
+        if self.index is not None:
+            self.index.flush()
+
+    def close(self) -> None:
+        self.file.close()
+        if self.index is not None:
+            self.index.close()
+
+    def __enter__(self) -> 'JournalWriter':
+        return self
+
+    def __exit__(self, *args) -> None:
+        self.close()
+
+
+def read_journal(path: str) -> tuple[int, tuple[bool, tuple[int, ...] | None], tuple[int, int, str, list[list[int]]], list[Move]]:
+    '''
+    Reads a whole journal at once.
+
+    :param path: The path of the journal file.
+    :returns: The seed of the game, how its blocks are drawn (see `parse_header`), its initial state
+    (score, difficulty, type of board, board) and its moves.
+    :raises JournalError: If the file isn't a valid journal.
+    '''
+    with open(path, 'rb') as f:
+        return parse_journal(f.read())
+
+def parse_header(content: bytes) -> tuple[int, tuple[bool, tuple[int, ...] | None], int, int]:
+    '''
+    :param content: The content of a journal file.
+    :returns: The seed of the game, how its blocks are drawn: whether from a bag, and the weights of the pool
+    (None for the default ones), then the offsets of the initial state and of the first move.
+    :raises JournalError: If the content doesn't start with a valid header.
+    '''
+    if len(content) < HEADER.size:
+        raise JournalError('the journal is truncated')
+    (magic, version, seed, length) = HEADER.unpack_from(content)
+    if magic != MAGIC or version not in [1, VERSION]:
+        raise JournalError('the file is not a journal')
+    start = HEADER.size
+    if version == 1:
+        return (seed, (False, None), start, start + length)
+    if len(content) < start + DRAWS.size:
+        raise JournalError('the journal is truncated')
+    (bag, count) = DRAWS.unpack_from(content, start)
+    start += DRAWS.size
+    if len(content) < start + 2 * count:
+        raise JournalError('the journal is truncated')
+    weights = struct.unpack_from(f'<{count}H', content, start) if count else None
+    start += 2 * count
+    return (seed, (bool(bag), weights), start, start + length)
+
+def parse_journal(content: bytes) -> tuple[int, tuple[bool, tuple[int, ...] | None], tuple[int, int, str, list[list[int]]], list[Move]]:
+    '''
+    :param content: The content of a journal file.
+    :returns: The seed of the game, how its blocks are drawn (see `parse_header`), its initial state
+    (score, difficulty, type of board, board) and its moves.
+    :raises JournalError: If the content isn't a valid journal.
+    '''
+    (seed, draws, initial_start, start) = parse_header(content)
+    try:
+        initial = decode(content[initial_start:start])
+    except CorruptedSaveError as e:
+        raise JournalError(f'the initial state is corrupted: {e}')
+    # A move which was being written when the game stopped is ignored.
+    count = (len(content) - start) // RECORD.size
+    moves = []
+    for (offered, block_index, x, y) in RECORD.iter_unpack(content[start:start + count * RECORD.size]):
+        moves.append(Move(tuple(k for k in offered if k != UNUSED), block_index, x, y))
+    return (seed, draws, initial, moves)
+
+def journal_start(content: bytes) -> int:
+    '''
+    :param content: The content of a valid journal file.
+    :returns: The offset of its first move, after the header and the initial state.
+    '''
+    return parse_header(content)[3]
+
+def start_state(seed: int, draws: tuple[bool, tuple[int, ...] | None], initial: tuple[int, int, str, list[list[int]]]) -> GameState:
+    '''
+    :param seed: The seed of the game.
+    :param draws: How the blocks of the game are drawn: whether from a bag, and the weights of the pool.
+    :param initial: The initial state of the game (score, difficulty, type of board, board).
+    :returns: The game, before its first move.
+    '''
+    (score, difficulty, board_type, board) = initial
+    (bag, weights) = draws
+    return GameState(board, board_type, difficulty, score, seed, bag, weights)
+
+def apply_move(state: GameState, move: Move) -> None:
+    '''
+    Plays a recorded move.
+
+    :param state: The game.
+    :param move: The move, which must be the next one of the game.
+    :raises JournalError: If the game doesn't go as it was recorded.
+    '''
+    state.offer()
+    if tuple(state.offered_indexes) != move.offered:
+        raise JournalError(f'the blocks offered on turn {state.turn} differ from the journal')
+    if not state.step(move.block_index, move.x, move.y).placed:
+        raise JournalError(f'the move of turn {state.turn} is invalid')
+
+def replay(path: str, turn: int | None = None) -> GameState:
+    '''
+    Rebuilds a game from its journal by playing its moves again.
+
+    :param path: The path of the journal file.
+    :param turn: The number of moves to play. By default, all of them.
+    :returns: The game, after the requested number of moves.
+    :raises JournalError: If the journal is invalid or doesn't match the game engine.
+    '''
+    (seed, draws, initial, moves) = read_journal(path)
+    state = start_state(seed, draws, initial)
+    for move in moves[:turn]:
+        apply_move(state, move)
+    return state
+
+def index_path(path: str) -> str:
+    '''
+    :param path: The path of a journal file.
+    :returns: The path of its index.
+    '''
+    return path + '.idx'
+
+def index_header(interval: int, height: int, width: int, seed: int, crc: int) -> bytes:
+    '''
+    :param interval: How many moves are played between two snapshots.
+    :param height: The height of the board.
+    :param width: The width of the board.
+    :param seed: The seed of the game.
+    :param crc: The CRC-32 of the header of the journal (up to its first move).
+    :returns: The header of an index.
+    '''
+    return INDEX_HEADER.pack(INDEX_MAGIC, INDEX_VERSION, interval, height, width, seed, crc)
+
+def bag_size(draws: tuple[bool, tuple[int, ...] | None], initial: tuple[int, int, str, list[list[int]]]) -> int:
+    '''
+    :param draws: How the blocks of the game are drawn: whether from a bag, and the weights of the pool.
+    :param initial: The initial state of the game (score, difficulty, type of board, board).
+    :returns: The size of the content of the bag in the snapshots (0 when the blocks aren't dealt from a bag).
+    '''
+    (bag, weights) = draws
+    if not bag:
+        return 0
+    (_, difficulty, board_type, _) = initial
+    return BAG.size + len(board_pool(board_type, difficulty, weights).bag)
+
+def snapshot(state: GameState, crc: int) -> bytes:
+    '''
+    :param state: The game.
+    :param crc: The CRC-32 of the journal up to the last move played.
+    :returns: The snapshot of the game, as stored in an index.
+    '''
+    (_, words, _) = state.rng.getstate()
+    data = SNAPSHOT.pack(state.turn, crc, state.score, *words)
+    generator = state.generator
+    if generator.bag is not None:
+        data += BAG.pack(len(generator.bag)) + bytes(generator.bag).ljust(len(generator.pool.bag), b'\xff')
+    return data + pack_cells(state.board)
+
+def restore(seed: int, draws: tuple[bool, tuple[int, ...] | None], initial: tuple[int, int, str, list[list[int]]], data: bytes) -> GameState:
+    '''
+    :param seed: The seed of the game.
+    :param draws: How the blocks of the game are drawn: whether from a bag, and the weights of the pool.
+    :param initial: The initial state of the game (score, difficulty, type of board, board).
+    :param data: A snapshot of the game (see `snapshot`).
+    :returns: The game, as it was when the snapshot was taken.
+    '''
+    (_, difficulty, board_type, board) = initial
+    (bag, weights) = draws
+    (turn, _, score, *words) = SNAPSHOT.unpack_from(data)
+    start = SNAPSHOT.size + bag_size(draws, initial)
+    state = GameState(unpack_cells(data[start:], len(board), len(board[0])), board_type, difficulty, score, seed, bag, weights)
+    state.rng.setstate((3, tuple(words), None))
+    if bag:
+        (count,) = BAG.unpack_from(data, SNAPSHOT.size)
+        state.generator.bag = list(data[SNAPSHOT.size + BAG.size:SNAPSHOT.size + BAG.size + count])
+    state.turn = turn
+    return state
+
+def build_index(path: str, interval: int = DEFAULT_INTERVAL) -> None:
+    '''
+    Writes the index of an existing journal, by replaying it.
+
+    :param path: The path of the journal file.
+    :param interval: How many moves are played between two snapshots.
+    :raises JournalError: If the journal is invalid or doesn't match the game engine.
+    '''
+    with open(path, 'rb') as f:
+        content = f.read()
+    (seed, draws, initial, moves) = parse_journal(content)
+    state = start_state(seed, draws, initial)
+    start = journal_start(content)
+    crc = zlib.crc32(content[:start])
+    with open(index_path(path), 'wb') as f:
+        f.write(index_header(interval, state.board.height, state.board.width, seed, crc))
+        for (k, move) in enumerate(moves):
+            apply_move(state, move)
+            crc = zlib.crc32(content[start + k * RECORD.size:start + (k + 1) * RECORD.size], crc)
+            if state.turn % interval == 0:
+                f.write(snapshot(state, crc))
+
+
+class Replay:
+    '''
+    A journaled game, which can be looked at any turn.
+    With an index, going to a turn only replays the moves since the previous snapshot.
+    '''
+
+    def __init__(self, path: str):
+        '''
+        :param path: The path of the journal file. Its index is used if it exists and is valid.
+        :raises JournalError: If the journal is invalid.
+        '''
+        with open(path, 'rb') as f:
+            journal = f.read()
+        (self.seed, self.draws, self.initial, self.moves) = parse_journal(journal)
+        self.interval = None
+        self.snapshots = []
+        try:
+            with open(index_path(path), 'rb') as f:
+                content = f.read()
+        except FileNotFoundError:
+            return
+        (_, _, _, board) = self.initial
+        if len(content) < INDEX_HEADER.size:
+            return
+        start = journal_start(journal)
+        crc = zlib.crc32(journal[:start])
+        (magic, version, interval, height, width, seed, header_crc) = INDEX_HEADER.unpack_from(content)
+        if (magic != INDEX_MAGIC or version != INDEX_VERSION or interval == 0 or (height, width) != (len(board), len(board[0]))
+                or (seed, header_crc) != (self.seed, crc)):
+            return
+        self.interval = interval
+        size = SNAPSHOT.size + bag_size(self.draws, self.initial) + (height * width + 3) // 4
+        # Snapshots are all the same size, the one taken after the move k * interval being the k-th.
+        # They are only kept as long as they were taken from the same moves as the ones of the journal.
+        turn = 0
+        for offset in range(INDEX_HEADER.size, len(content) - size + 1, size):
+            (snapshot_turn, snapshot_crc) = SNAPSHOT.unpack_from(content, offset)[:2]
+            if snapshot_turn != turn + interval or snapshot_turn > len(self.moves):
+                break
+            crc = zlib.crc32(journal[start + turn * RECORD.size:start + snapshot_turn * RECORD.size], crc)
+            if crc != snapshot_crc:
+                break
+            turn = snapshot_turn
+            self.snapshots.append(content[offset:offset + size])
+
+    def __len__(self) -> int:
+        '''
+        :returns: The number of moves of the game.
+        '''
+        return len(self.moves)
+
+    def state_at(self, turn: int) -> GameState:
+        '''
+        :param turn: The number of moves played, between 0 and the number of moves of the game.
+        :returns: The game after this number of moves.
+        :raises JournalError: If the journal doesn't match the game engine.
+        '''
+        turn = max(0, min(turn, len(self.moves)))
+        k = min(turn // self.interval, len(self.snapshots)) if self.interval else 0
+        if k > 0:
+            state = restore(self.seed, self.draws, self.initial, self.snapshots[k - 1])
+        else:
+            state = start_state(self.seed, self.draws, self.initial)
+        for move in self.moves[state.turn:turn]:
+            apply_move(state, move)
+        return state
@@ -0,0 +1,237 @@
+'''
+Optional NumPy representation of the boards, to play or score many games at once.
+Boards are `uint8` arrays using the same values as the matrices (0: non-playable, 1: free, 2: filled).
+Every function accepts a single board of shape (H, W) or a stack of independent boards of shape (batch, H, W).
+
+This module requires NumPy, which the game itself doesn't need.
+'''
+from functools import lru_cache
+
+try:
+    import numpy as np
+except ImportError as e:
+    raise ImportError('The NumPy backend requires NumPy to be installed (pip install numpy).') from e
+
+from .bitboard import Bitboard
+from .constants import boards
+from .pieces import Piece
+
+FREE = 1
+FILLED = 2
+
+
+def to_array(board: list[list[int]] | Bitboard) -> np.ndarray:
+    '''
+    :param board: The board to convert.
+    :returns: The board as a (H, W) array.
+    '''
+    return np.array(board.to_grid() if isinstance(board, Bitboard) else board, dtype=np.uint8)
+
+def to_bitboard(array: np.ndarray) -> Bitboard:
+    '''
+    :param array: A (H, W) board.
+    :returns: The board as a Bitboard.
+    '''
+    return Bitboard(array.tolist())
+
+@lru_cache(maxsize=None)
+def board_array(size: str, board_type: str) -> np.ndarray:
+    '''
+    Returns one of the boards of `constants.boards` as an array. The array is shared, hence read-only: copy it to play on it.
+
+    :param size: The size of the board (SMALL, MEDIUM or LARGE).
+    :param board_type: The type of board (CIRCLE, DIAMOND or TRIANGLE).
+    :returns: The (H, W) array of the empty board.
+    '''
+    array = to_array(getattr(boards, f'{size}_{board_type}_BOARD'))
+    array.flags.writeable = False
+    return array
+
+def stack(board: np.ndarray, batch: int) -> np.ndarray:
+    '''
+    :param board: A (H, W) board.
+    :param batch: The number of copies.
+    :returns: A (batch, H, W) stack of independent copies of the board.
+    '''
+    return np.repeat(board[np.newaxis], batch, axis=0)
+
+def full_rows(boards: np.ndarray) -> np.ndarray:
+    '''
+    :param boards: The board(s).
+    :returns: A boolean array of shape (H,) or (batch, H) telling which rows have no free cell left.
+    '''
+    return np.all(boards != FREE, axis=-1)
+
+def full_cols(boards: np.ndarray) -> np.ndarray:
+    '''
+    :param boards: The board(s).
+    :returns: A boolean array of shape (W,) or (batch, W) telling which columns have no free cell left.
+    '''
+    return np.all(boards != FREE, axis=-2)
+
+def clear_lines(boards: np.ndarray) -> tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+    '''
+    Clears every full row, then every full column, with the same result as `game.clear_lines`.
+    Modifies the provided array **in-place**.
+
+    :param boards: The board(s).
+    :returns: A tuple containing:
+        - The boolean mask of the cleared rows, of shape (H,) or (batch, H).
+        - The boolean mask of the cleared columns, of shape (W,) or (batch, W).
+        - How many cells were cleared by the rows, per board.
+        - How many cells were cleared by the columns, per board.
+    '''
+    single = boards.ndim == 2
+    b = boards[np.newaxis] if single else boards
+    (batch, height, width) = b.shape
+
+    rows = full_rows(b)
+    filled = b == FILLED
+    row_cells = np.sum(filled & rows[:, :, np.newaxis], axis=(1, 2))
+    # Every row which isn't cleared falls by the number of cleared rows below it.
+    below = np.cumsum(rows[:, ::-1], axis=1)[:, ::-1] - rows
+    destination = np.arange(height) + below
+    # While falling, a filled cell goes through every row down to its destination,
+    # and is lost if any of them is non-playable at its column.
+    blocked = np.cumsum(b == 0, axis=1)
+    (bi, source) = np.nonzero(~rows)
+    target = destination[bi, source]
+    kept = filled[bi, source] & (blocked[bi, target] == blocked[bi, source])
+    cleared = np.where(b != 0, FREE, 0).astype(np.uint8)
+    cleared[bi, target] = np.where(kept, FILLED, cleared[bi, target])
+
+    cols = full_cols(cleared)
+    col_mask = (cleared == FILLED) & cols[:, np.newaxis, :]
+    col_cells = np.sum(col_mask, axis=(1, 2))
+    cleared[col_mask] = FREE
+
+    b[...] = cleared
+    if single:
+        return (rows[0], cols[0], row_cells[0], col_cells[0])
+    return (rows, cols, row_cells, col_cells)
+
+def lines_score(cleared_rows: np.ndarray, cleared_cols: np.ndarray, row_cells: np.ndarray, col_cells: np.ndarray) -> np.ndarray:
+    '''
+    Vectorized version of `game.lines_score`.
+
+    :param cleared_rows: How many rows were cleared, per board.
+    :param cleared_cols: How many columns were cleared, per board.
+    :param row_cells: How many cells were cleared by the rows, per board.
+    :param col_cells: How many cells were cleared by the columns, per board.
+    :returns: The points earned, per board.
+    '''
+    cleared_rows = np.asarray(cleared_rows, dtype=np.int64)
+    cleared_cols = np.asarray(cleared_cols, dtype=np.int64)
+    total = np.asarray(col_cells, dtype=np.int64) * 3 * cleared_cols + np.asarray(row_cells, dtype=np.int64) * 3 + cleared_rows
+    combo = (cleared_rows != 0) & (cleared_cols != 0)
+    return np.where(combo, total * np.minimum(cleared_rows, cleared_cols) * 2, total)
+
+def place(boards: np.ndarray, pieces: Piece | list[Piece], xs: np.ndarray, ys: np.ndarray) -> np.ndarray:
+    '''
+    Places a piece on each board, where it fits. Modifies the provided array **in-place**.
+
+    :param boards: The board(s).
+    :param pieces: The piece to place on every board, or one piece per board.
+    :param xs: The x coordinate of the piece on each board.
+    :param ys: The y coordinate of the piece on each board (from the bottom of the piece).
+    :returns: A boolean array telling on which boards the piece was placed (a boolean for a single board).
+    '''
+    if boards.ndim == 2:
+        return bool(place(boards[np.newaxis], pieces, np.reshape(xs, 1), np.reshape(ys, 1))[0])
+    (batch, height, width) = boards.shape
+    xs = np.asarray(xs, dtype=np.int64)
+    ys = np.asarray(ys, dtype=np.int64)
+    placed = np.zeros(batch, dtype=bool)
+    if isinstance(pieces, Piece):
+        groups = {pieces: np.arange(batch)}
+    else:
+        # Boards are grouped by piece, so that each group is placed with a single gather and scatter.
+        groups = {}
+        for (k, piece) in enumerate(pieces):
+            groups.setdefault(piece, []).append(k)
+    for (piece, indexes) in groups.items():
+        indexes = np.asarray(indexes)
+        (x, y) = (xs[indexes], ys[indexes])
+        inside = (x >= 0) & (x + piece.width <= width) & (y - piece.height + 1 >= 0) & (y < height)
+        indexes = indexes[inside]
+        (x, y) = (x[inside], y[inside])
+        offsets = np.array(piece.cells)
+        cells_x = x[:, np.newaxis] + offsets[:, 0]
+        cells_y = y[:, np.newaxis] + offsets[:, 1]
+        cells_b = indexes[:, np.newaxis]
+        fits = np.all(boards[cells_b, cells_y, cells_x] == FREE, axis=1)
+        (cells_b, cells_y, cells_x) = (cells_b[fits], cells_y[fits], cells_x[fits])
+        boards[np.broadcast_to(cells_b, cells_x.shape), cells_y, cells_x] = FILLED
+        placed[indexes[fits]] = True
+    return placed
+
+def step(boards: np.ndarray, pieces: Piece | list[Piece], xs: np.ndarray, ys: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+    '''
+    Plays one move on each board: places the piece, clears the full lines and scores the move,
+    like `GameState.step` does for a single game. Modifies the provided array **in-place**.
+
+    :param boards: The board(s).
+    :param pieces: The piece to place on every board, or one piece per board.
+    :param xs: The x coordinate of the piece on each board.
+    :param ys: The y coordinate of the piece on each board (from the bottom of the piece).
+    :returns: A tuple containing the boolean array of the boards on which the piece was placed,
+    and the points earned on each board (0 where the piece couldn't be placed). For a single board, a boolean and a number.
+    '''
+    if boards.ndim == 2:
+        (placed, score) = step(boards[np.newaxis], pieces, np.reshape(xs, 1), np.reshape(ys, 1))
+        return (bool(placed[0]), int(score[0]))
+    placed = place(boards, pieces, xs, ys)
+    values = np.array([pieces.value] * len(boards) if isinstance(pieces, Piece) else [p.value for p in pieces], dtype=np.int64)
+    (rows, cols, row_cells, col_cells) = clear_lines(boards)
+    score = values + lines_score(rows.sum(axis=1), cols.sum(axis=1), row_cells, col_cells)
+    return (placed, np.where(placed, score, 0))
+
+@lru_cache(maxsize=None)
+def piece_array(piece: Piece) -> np.ndarray:
+    '''
+    :param piece: The piece to convert.
+    :returns: The (height, width) boolean mask of the truncated piece (see `truncate_block`). Read-only.
+    '''
+    array = np.array([[mask >> l & 1 for l in range(piece.width)] for mask in piece.masks], dtype=bool)
+    array.flags.writeable = False
+    return array
+
+# Sliding windows are faster, but need one byte per (board cell, piece square) pair.
+# Above this many pairs, `placement_map` correlates through FFTs instead.
+FFT_THRESHOLD = 1 << 28
+
+def placement_map(boards: np.ndarray, piece: Piece, method: str = 'auto') -> np.ndarray:
+    '''
+    Finds every position at which a piece can be placed, at once, by correlating the piece with the free cells.
+    The result matches `game.valid_position`: the piece is anchored by its bottom left corner.
+
+    :param boards: The board(s).
+    :param piece: The piece to place.
+    :param method: 'window' to check every window of the board, 'fft' to count the non-free cells under the piece
+    with Fourier transforms (lighter on memory for huge batches), or 'auto' to pick one depending on the sizes.
+    :returns: A boolean array of the shape of `boards`, in which [..., y, x] is whether the piece can be placed at (x, y).
+    '''
+    mask = piece_array(piece)
+    (h, w) = mask.shape
+    (height, width) = boards.shape[-2:]
+    valid = np.zeros(boards.shape, dtype=bool)
+    if h > height or w > width:
+        return valid
+    if method == 'auto':
+        method = 'fft' if boards.size * len(piece.cells) > FFT_THRESHOLD else 'window'
+    if method == 'window':
+        windows = np.lib.stride_tricks.sliding_window_view(boards == FREE, (h, w), axis=(-2, -1))
+        # windows[..., t, x, :, :] is the (h, w) window whose top left corner is (x, t).
+        top_left = np.all(windows[..., mask], axis=-1)
+    elif method == 'fft':
+        blocked = (boards != FREE).astype(np.float64)
+        shape = (height + h - 1, width + w - 1)
+        # Convolving with the flipped piece correlates with the piece itself.
+        kernel = np.fft.rfft2(mask[::-1, ::-1].astype(np.float64), shape)
+        counts = np.fft.irfft2(np.fft.rfft2(blocked, shape, axes=(-2, -1)) * kernel, shape, axes=(-2, -1))
+        top_left = counts[..., h - 1:height, w - 1:width] < 0.5
+    else:
+        raise ValueError(f'unknown method: {method}')
+    # The anchor is the bottom left corner of the piece, h - 1 rows below the top of the window.
+    valid[..., h - 1:, :width - w + 1] = top_left
+    return valid
@@ -0,0 +1,113 @@
+__all__ = ['block_masks', 'Piece', 'as_piece', 'COMMON_PIECES', 'CIRCLE_PIECES', 'DIAMOND_PIECES', 'TRIANGLE_PIECES']
+
+
+def block_masks(block: list[list[int]]) -> tuple[int, tuple[int, ...]]:
+    '''
+    Converts a block into the bitmasks of its rows, from top to bottom.
+    The bit `j` of a mask represents the column `j` of the block.
+    Like `truncate_block`, the empty rows above the block are dropped.
+
+    :param block: The block to convert.
+    :returns: A tuple containing the actual width of the block and the masks of its rows.
+    '''
+    masks = []
+    for row in block:
+        mask = 0
+        for j in range(len(row)):
+            if row[j] == 1:
+                mask |= 1 << j
+        # Rows above the first non-empty one are not part of the actual block.
+        if mask or masks:
+            masks.append(mask)
+    width = 0
+    for mask in masks:
+        width = max(width, mask.bit_length())
+    return (width, tuple(masks))
+
+
+class Piece:
+    '''
+    The precompiled, immutable form of a block.
+    Everything the game needs to know about the shape of a block is computed once, when the piece is built.
+    Pieces are interned: use `as_piece` to get the unique piece of a shape.
+
+    - `rows`: The matrix the block is stored in (usually 5x5), used for display.
+    - `width`, `height`: The actual size of the block (see `actual_size`).
+    - `cells`: The (x, y) offsets of the squares of the block from its bottom left corner (y offsets are <= 0).
+    - `masks`: The bitmasks of the rows of the truncated block, from top to bottom.
+    - `value`: The points earned when placing the block (see `block_value`).
+    '''
+    __slots__ = ('rows', 'width', 'height', 'cells', 'masks', 'value')
+
+    def __init__(self, block: list[list[int]]):
+        '''
+        :param block: The matrix of the block.
+        '''
+        (width, masks) = block_masks(block)
+        height = len(masks)
+        cells = []
+        for k in range(height):
+            for l in range(width):
+                if masks[k] >> l & 1:
+                    cells.append((l, k - height + 1))
+        set_attr = object.__setattr__
+        set_attr(self, 'rows', tuple(tuple(row) for row in block))
+        set_attr(self, 'width', width)
+        set_attr(self, 'height', height)
+        set_attr(self, 'cells', tuple(cells))
+        set_attr(self, 'masks', masks)
+        # Each square of a block is worth 2 points.
+        set_attr(self, 'value', len(cells) * 2)
+
+    def __setattr__(self, name, value):
+        raise AttributeError('Piece objects are immutable')
+
+    def __delattr__(self, name):
+        raise AttributeError('Piece objects are immutable')
+
+    def __repr__(self) -> str:
+        return f'Piece({self.width}x{self.height}, masks={self.masks})'
+
+
+# Interned pieces, by the masks of their shape.
+_PIECES: dict[tuple[int, ...], Piece] = {}
+# Pieces of the blocks from the constant tables, by identity of the matrix.
+# Those matrices live as long as the program does, so their ids are never reused.
+_BY_ID: dict[int, Piece] = {}
+
+def as_piece(block: list[list[int]] | Piece) -> Piece:
+    '''
+    Returns the interned piece of a block. Pieces are returned as they are.
+
+    :param block: A block matrix or a piece.
+    :returns: The piece of this block.
+    '''
+    if isinstance(block, Piece):
+        return block
+    piece = _BY_ID.get(id(block))
+    if piece is not None:
+        return piece
+    piece = Piece(block)
+    return _PIECES.setdefault(piece.masks, piece)
+
+def _compile(blocks: list[list[list[int]]]) -> tuple[Piece, ...]:
+    pieces = []
+    for block in blocks:
+        piece = as_piece(block)
+        _BY_ID[id(block)] = piece
+        pieces.append(piece)
+    return tuple(pieces)
+
+def __getattr__(name: str) -> tuple[Piece, ...]:
+    '''
+    Compiles the tables of pieces (COMMON_PIECES, CIRCLE_PIECES, DIAMOND_PIECES and TRIANGLE_PIECES)
+    from the blocks of `constants.blocks` the first time they are used, so that importing the module costs nothing.
+    '''
+    if name.endswith('_PIECES'):
+        from .constants import blocks
+        table = getattr(blocks, name[:-len('_PIECES')] + '_BLOCKS', None)
+        if table is not None:
+            pieces = _compile(table)
+            globals()[name] = pieces
+            return pieces
+    raise AttributeError(f'module {__name__!r} has no attribute {name!r}')
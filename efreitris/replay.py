@@ -0,0 +1,58 @@
+import argparse
+
+from .display import clear_screen, display_blocks, display_board
+from .journal import DEFAULT_INTERVAL, JournalError, Replay, apply_move, build_index, index_path
+
+
+def view(path: str) -> None:
+    '''
+    Lets the user go through a journaled game, move by move.
+
+    :param path: The path of the journal file.
+    '''
+    game = Replay(path)
+    state = game.state_at(0)
+    command = ''
+    while command not in ['q', 'quit', 'exit']:
+        clear_screen()
+        score_str = f' Turn: {state.turn}/{len(game)}  Score: {state.score} '
+        print('-'*len(score_str))
+        print(score_str)
+        print('-'*len(score_str))
+        display_board(state.board)
+        if state.turn < len(game):
+            # The blocks offered for the next move, and the one which was played.
+            move = game.moves[state.turn]
+            offered = [state.pool[k] for k in move.offered]
+            for i in range(0, len(offered), 5):
+                display_blocks(offered[i:i+5])
+            print(f'Next move: block {move.block_index + 1} at {chr(move.x + 97)}{chr(move.y + 65)}')
+        command = input('[n]ext, [p]revious, [g]o <turn>, [q]uit: ').strip().lower()
+        words = command.split() or ['n']
+        try:
+            if words[0] in ['n', 'next']:
+                # Going forward only plays the next move, going anywhere else restarts from a snapshot.
+                if state.turn < len(game):
+                    apply_move(state, game.moves[state.turn])
+            elif words[0] in ['p', 'previous']:
+                state = game.state_at(state.turn - 1)
+            elif words[0] in ['g', 'go'] and len(words) == 2 and words[1].isdigit():
+                state = game.state_at(int(words[1]))
+        except JournalError as e:
+            print(f'The journal does not match the game: {e}')
+            input('-- Press ENTER to continue --')
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description='Replays a journaled Efreitris game.')
+    parser.add_argument('journal')
+    parser.add_argument('--index', type=int, metavar='INTERVAL', nargs='?', const=DEFAULT_INTERVAL, default=None,
+                        help=f'(re)build the index of the journal, with a snapshot every INTERVAL moves (default: {DEFAULT_INTERVAL})')
+    args = parser.parse_args()
+    if args.index is not None:
+        build_index(args.journal, args.index)
+        print(f'Index written to {index_path(args.journal)}')
+    else:
+        view(args.journal)
+
+if __name__ == '__main__':
+    main()
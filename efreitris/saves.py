@@ -0,0 +1,261 @@
+'''
+Save files, in a compact binary format:
+    - A header: the magic bytes, the version of the format, the type of board, the difficulty,
+      the encoding of the board, the score and the size of the board.
+    - The board, encoded in one of two ways, whichever is the smallest:
+        - PACKED: every cell on 2 bits, 4 cells per byte, row by row.
+        - SPARSE: the indexes of the filled cells (on 2 bytes, or 4 on boards of more than 65536 cells),
+          when the board is one of `constants.boards` with few cells filled.
+    - The CRC32 of everything above.
+
+Each save slot is a file of its own, and files are replaced atomically so that a crash never leaves half a save.
+'''
+import os
+import struct
+import zlib
+from itertools import chain
+
+from .bitboard import Bitboard
+
+MAGIC = b'EFTS'
+VERSION = 1
+BOARD_TYPES = ['CIRCLE', 'DIAMOND', 'TRIANGLE']
+SIZES = ['SMALL', 'MEDIUM', 'LARGE']
+PACKED = 0
+SPARSE = 1
+# magic, version, board type, difficulty, encoding, score, height, width
+HEADER = struct.Struct('<4sBBBBQHH')
+COUNT = struct.Struct('<I')
+CRC = struct.Struct('<I')
+
+DEFAULT_SLOT = 'default'
+# The characters the names of the slots can be made of.
+SLOT_CHARACTERS = frozenset('abcdefghijklmnopqrstuvwxyzABCDEFGHIJKLMNOPQRSTUVWXYZ0123456789_-')
+SAVE_DIR = '.'
+# The default slot keeps the name of the original save file.
+SAVE_PREFIX = '~SAVE'
+
+# The 4 cells packed in each possible byte, from the lowest bits.
+_UNPACKED = [(b & 3, b >> 2 & 3, b >> 4 & 3, b >> 6) for b in range(256)]
+
+
+class CorruptedSaveError(ValueError):
+    '''
+    Raised when a save file can't be read.
+    '''
+
+
+def slot_path(slot: str = DEFAULT_SLOT) -> str:
+    '''
+    :param slot: The name of the slot. It can only contain letters, digits, dashes and underscores.
+    :returns: The path of the file of the slot.
+    '''
+    if not slot or not set(slot) <= SLOT_CHARACTERS:
+        raise ValueError(f'invalid save slot name: {slot!r}')
+    if slot == DEFAULT_SLOT:
+        return os.path.join(SAVE_DIR, SAVE_PREFIX)
+    return os.path.join(SAVE_DIR, f'{SAVE_PREFIX}-{slot}')
+
+def list_slots() -> list[str]:
+    '''
+    :returns: The names of the slots which have a save file, the default slot first.
+    '''
+    slots = []
+    for name in sorted(os.listdir(SAVE_DIR)):
+        if name == SAVE_PREFIX:
+            slots.insert(0, DEFAULT_SLOT)
+        elif name.startswith(SAVE_PREFIX + '-') and len(name) > len(SAVE_PREFIX) + 1 and set(name[len(SAVE_PREFIX) + 1:]) <= SLOT_CHARACTERS:
+            slots.append(name[len(SAVE_PREFIX) + 1:])
+    return slots
+
+def delete_slot(slot: str = DEFAULT_SLOT) -> None:
+    '''
+    Deletes the save file of a slot, if it exists.
+
+    :param slot: The name of the slot.
+    '''
+    path = slot_path(slot)
+    if os.path.exists(path):
+        os.remove(path)
+
+def template(board_type: str, height: int, width: int) -> list[list[int]] | None:
+    '''
+    :param board_type: The type of board.
+    :param height: The height of the board.
+    :param width: The width of the board.
+    :returns: The empty board of `constants.boards` of this type and size, if there is one.
+    '''
+    from .constants import boards
+    for size in SIZES:
+        board = getattr(boards, f'{size}_{board_type}_BOARD')
+        if len(board) == height and len(board[0]) == width:
+            return board
+    return None
+
+def index_format(height: int, width: int) -> str:
+    '''
+    :returns: The struct format of a cell index in the SPARSE encoding of a board of this size.
+    '''
+    return 'H' if height * width <= 1 << 16 else 'I'
+
+def pack_cells(board: list[list[int]] | Bitboard) -> bytes:
+    '''
+    :param board: The board to pack.
+    :returns: The cells of the board on 2 bits each, 4 cells per byte from the lowest bits, row by row.
+    '''
+    cells = list(chain.from_iterable(board))
+    cells += [0] * (-len(cells) % 4)
+    return bytes(cells[k] | cells[k + 1] << 2 | cells[k + 2] << 4 | cells[k + 3] << 6 for k in range(0, len(cells), 4))
+
+def unpack_cells(data: bytes, height: int, width: int) -> list[list[int]]:
+    '''
+    :param data: The packed cells of a board (see `pack_cells`).
+    :param height: The height of the board.
+    :param width: The width of the board.
+    :returns: The board.
+    :raises CorruptedSaveError: If the data doesn't contain a valid board of this size.
+    '''
+    if len(data) != (height * width + 3) // 4:
+        raise CorruptedSaveError('the board has the wrong size')
+    cells = list(chain.from_iterable(_UNPACKED[b] for b in data))[:height * width]
+    if 3 in cells:
+        raise CorruptedSaveError('the board contains invalid cells')
+    return [cells[y * width:(y + 1) * width] for y in range(height)]
+
+def encode(score: int, difficulty: int, board_type: str, board: list[list[int]] | Bitboard) -> bytes:
+    '''
+    :param score: The score of the game.
+    :param difficulty: The difficulty of the game.
+    :param board_type: The type of board used.
+    :param board: The state of the board.
+    :returns: The content of the save file.
+    '''
+    cells = list(chain.from_iterable(board))
+    (height, width) = (len(board), len(board[0]))
+    empty = template(board_type, height, width)
+    filled = [k for k in range(len(cells)) if cells[k] == 2]
+    # The sparse encoding only stores the filled cells, so the rest of the board must be the template.
+    if (empty is not None
+            and COUNT.size + struct.calcsize(index_format(height, width)) * len(filled) < (len(cells) + 3) // 4
+            and all((cells[k] != 0) == (c != 0) for (k, c) in enumerate(chain.from_iterable(empty)))):
+        encoding = SPARSE
+        data = COUNT.pack(len(filled)) + struct.pack(f'<{len(filled)}{index_format(height, width)}', *filled)
+    else:
+        encoding = PACKED
+        data = pack_cells(board)
+    content = HEADER.pack(MAGIC, VERSION, BOARD_TYPES.index(board_type), difficulty, encoding, score, height, width) + data
+    return content + CRC.pack(zlib.crc32(content))
+
+def decode(content: bytes) -> tuple[int, int, str, list[list[int]]]:
+    '''
+    :param content: The content of a save file.
+    :returns: The score, the difficulty, the type of board and the state of the board.
+    :raises CorruptedSaveError: If the content isn't a valid save.
+    '''
+    if not content.startswith(MAGIC):
+        return decode_legacy(content)
+    if len(content) < HEADER.size + CRC.size:
+        raise CorruptedSaveError('the file is truncated')
+    (crc,) = CRC.unpack_from(content, len(content) - CRC.size)
+    if zlib.crc32(content[:-CRC.size]) != crc:
+        raise CorruptedSaveError('the checksum does not match')
+    (_, version, board_type, difficulty, encoding, score, height, width) = HEADER.unpack_from(content)
+    if version != VERSION:
+        raise CorruptedSaveError(f'unknown save version {version}')
+    if board_type >= len(BOARD_TYPES) or difficulty not in [1, 2] or height == 0 or width == 0:
+        raise CorruptedSaveError('the header is invalid')
+    board_type = BOARD_TYPES[board_type]
+    data = content[HEADER.size:-CRC.size]
+    if encoding == PACKED:
+        board = unpack_cells(data, height, width)
+    elif encoding == SPARSE:
+        empty = template(board_type, height, width)
+        if empty is None or len(data) < COUNT.size:
+            raise CorruptedSaveError('the board has the wrong size')
+        (count,) = COUNT.unpack_from(data)
+        index = index_format(height, width)
+        if len(data) != COUNT.size + struct.calcsize(index) * count:
+            raise CorruptedSaveError('the board has the wrong size')
+        cells = list(chain.from_iterable(empty))
+        for k in struct.unpack_from(f'<{count}{index}', data, COUNT.size):
+            if k >= len(cells) or cells[k] == 0:
+                raise CorruptedSaveError('the board contains invalid cells')
+            cells[k] = 2
+        board = [cells[y * width:(y + 1) * width] for y in range(height)]
+    else:
+        raise CorruptedSaveError(f'unknown board encoding {encoding}')
+    return (score, difficulty, board_type, board)
+
+def decode_legacy(content: bytes) -> tuple[int, int, str, list[list[int]]]:
+    '''
+    Reads the text format of the first versions of the game: the score, the difficulty
+    and the type of board on one line each, followed by one line of digits per row of the board.
+
+    :param content: The content of a save file.
+    :returns: The score, the difficulty, the type of board and the state of the board.
+    :raises CorruptedSaveError: If the content isn't a valid save.
+    '''
+    try:
+        lines = content.decode('ascii').split('\n')
+        score = int(lines[0])
+        difficulty = int(lines[1])
+    except (UnicodeDecodeError, ValueError, IndexError):
+        raise CorruptedSaveError('the file is not a save file')
+    board_type = lines[2].strip()
+    if board_type not in BOARD_TYPES:
+        raise CorruptedSaveError('the type of board is invalid')
+    rows = [line.strip() for line in lines[3:] if line.strip()]
+    # Every row must have the same length, and every character must be 0, 1 or 2.
+    if not rows or any(len(row) != len(rows[0]) or row.strip('012') for row in rows):
+        raise CorruptedSaveError('the board is invalid')
+    return (score, difficulty, board_type, [[int(c) for c in row] for row in rows])
+
+def write_save(score: int, difficulty: int, board_type: str, board: list[list[int]] | Bitboard, slot: str = DEFAULT_SLOT) -> None:
+    '''
+    Saves a game in a slot. The file is written next to its destination then renamed,
+    so the previous save is only replaced once the new one is complete.
+
+    :param score: The score of the game.
+    :param difficulty: The difficulty of the game.
+    :param board_type: The type of board used.
+    :param board: The state of the board.
+    :param slot: The name of the slot.
+    '''
+    # Only needed when saving, and slow to import.
+    import tempfile
+    path = slot_path(slot)
+    content = encode(score, difficulty, board_type, board)
+    (fd, temp) = tempfile.mkstemp(dir=os.path.dirname(path) or '.', prefix='.tmp-', suffix=SAVE_PREFIX)
+    try:
+        with os.fdopen(fd, 'wb') as f:
+            f.write(content)
+            f.flush()
+            os.fsync(f.fileno())
+        # mkstemp creates the file readable by its owner only: the save gets the permissions of the one it replaces,
+        # or the ones `open` would have given it.
+        try:
+            mode = os.stat(path).st_mode & 0o777
+        except FileNotFoundError:
+            umask = os.umask(0)
+            os.umask(umask)
+            mode = 0o666 & ~umask
+        os.chmod(temp, mode)
+        os.replace(temp, path)
+    except BaseException:
+        os.remove(temp)
+        raise
+
+def read_save(slot: str = DEFAULT_SLOT) -> tuple[int, int, str, list[list[int]]] | None:
+    '''
+    Reads the save of a slot. A corrupted file is left untouched.
+
+    :param slot: The name of the slot.
+    :returns: The score, the difficulty, the type of board and the state of the board, or None if the slot is empty.
+    :raises CorruptedSaveError: If the file can't be read.
+    '''
+    try:
+        with open(slot_path(slot), 'rb') as f:
+            content = f.read()
+    except FileNotFoundError:
+        return None
+    return decode(content)
@@ -0,0 +1,143 @@
+'''
+Boards of any size, built from the shapes of the boards of the game (in the same 0/1 convention as `constants.boards`),
+e.g. `circle(100)`, or `board('TRIANGLE', 500)` for a triangle of 500 rows and 999 columns.
+
+Every row of these shapes is a single run of playable cells, so a board is built from the first and last playable
+column of each row: the math is done once per row, and identical rows are the same tuple. Boards are cached
+(and immutable), so asking for the same board again costs nothing.
+
+The boards of the game are the `STANDARD_BOARDS` (see `standard_board`), from which `constants.boards` can be rebuilt.
+'''
+import math
+from functools import lru_cache
+
+# The largest height and width of the generated boards.
+MAX_SIZE = 1000
+# The parameters of the boards of the game, by size and type of board.
+STANDARD_BOARDS = {
+    ('SMALL', 'CIRCLE'): {'height': 12, 'corner': 3},
+    ('SMALL', 'DIAMOND'): {'height': 13},
+    ('SMALL', 'TRIANGLE'): {'height': 7},
+    ('MEDIUM', 'CIRCLE'): {'height': 19, 'corner': 3},
+    ('MEDIUM', 'DIAMOND'): {'height': 19},
+    ('MEDIUM', 'TRIANGLE'): {'height': 9, 'width': 19, 'base': 17},
+    ('LARGE', 'CIRCLE'): {'height': 24, 'corner': 3},
+    ('LARGE', 'DIAMOND'): {'height': 23},
+    ('LARGE', 'TRIANGLE'): {'height': 12},
+}
+
+Board = tuple[tuple[int, ...], ...]
+
+
+def from_spans(width: int, spans: list[tuple[int, int]]) -> Board:
+    '''
+    :param width: The width of the board.
+    :param spans: The first playable column and the column after the last one, of each row.
+    :returns: The board.
+    :raises ValueError: If a row has no playable cell: no block could ever clear it.
+    '''
+    rows = {}
+    board = []
+    for span in spans:
+        row = rows.get(span)
+        if row is None:
+            (start, end) = span
+            if end <= start:
+                raise ValueError(f'every row of a board needs a playable cell, the row {len(board)} has none')
+            row = rows[span] = (0,) * start + (1,) * (end - start) + (0,) * (width - end)
+        board.append(row)
+    return tuple(board)
+
+def check_size(height: int, width: int) -> None:
+    '''
+    :raises ValueError: If the size isn't between 1 and `MAX_SIZE`.
+    '''
+    if not (1 <= height <= MAX_SIZE and 1 <= width <= MAX_SIZE):
+        raise ValueError(f'boards must be between 1x1 and {MAX_SIZE}x{MAX_SIZE}, not {height}x{width}')
+
+@lru_cache(maxsize=64)
+def circle(height: int, width: int | None = None, corner: int | None = None) -> Board:
+    '''
+    A "circle" board as the game draws them: a rectangle with its corners cut diagonally.
+
+    :param height: The height of the board.
+    :param width: The width of the board, the height by default.
+    :param corner: How many cells are cut from each end of the first row (one less on the next row, and so on).
+    By default, the corners are cut like in a regular octagon, the closest to a circle. It is reduced if needed,
+    so that every row keeps a playable cell.
+    :returns: The board.
+    '''
+    width = width or height
+    check_size(height, width)
+    if corner is None:
+        corner = round(min(height, width) / (2 + math.sqrt(2)))
+    corner = min(corner, (min(height, width) - 1) // 2)
+    spans = []
+    for i in range(height):
+        cut = max(0, corner - min(i, height - 1 - i))
+        spans.append((cut, width - cut))
+    return from_spans(width, spans)
+
+@lru_cache(maxsize=64)
+def diamond(height: int, width: int | None = None) -> Board:
+    '''
+    A diamond board: the cells whose center is inside the rhombus joining the middles of the sides of the board.
+
+    :param height: The height of the board.
+    :param width: The width of the board, the height by default.
+    :returns: The board.
+    '''
+    width = width or height
+    check_size(height, width)
+    spans = []
+    for i in range(height):
+        # The cell (i, j) is playable if |2j + 1 - width| * height + |2i + 1 - height| * width <= width * height.
+        reach = width * (height - abs(2 * i + 1 - height)) // height
+        # The tips keep the middle cell, or the two middle cells of an even width, even if their centers are outside.
+        reach = max(reach, 2 - width % 2)
+        spans.append(((width - reach) // 2, (width + reach + 1) // 2))
+    return from_spans(width, spans)
+
+@lru_cache(maxsize=64)
+def triangle(height: int, width: int | None = None, base: int | None = None) -> Board:
+    '''
+    A triangle board, pointing up: the cells whose center is inside the triangle joining the middle of the top side
+    to the ends of its base, centered on the bottom side of the board.
+
+    :param height: The height of the board.
+    :param width: The width of the board, 2 * height - 1 by default (like the boards of the game).
+    :param base: The length of the base of the triangle, the width by default.
+    :returns: The board.
+    '''
+    width = width or 2 * height - 1
+    base = base or width
+    check_size(height, width)
+    spans = []
+    for i in range(height):
+        # The cell (i, j) is playable if |2j + 1 - width| * 2 * height <= base * (2i + 1).
+        reach = base * (2 * i + 1) // (2 * height)
+        # The tip keeps the middle cell, or the two middle cells of an even width, even if their centers are outside.
+        reach = max(reach, 2 - width % 2)
+        spans.append(((width - reach) // 2, (width + reach + 1) // 2))
+    return from_spans(width, spans)
+
+GENERATORS = {'CIRCLE': circle, 'DIAMOND': diamond, 'TRIANGLE': triangle}
+
+def board(board_type: str, height: int, width: int | None = None) -> Board:
+    '''
+    :param board_type: The type of board (CIRCLE, DIAMOND or TRIANGLE).
+    :param height: The height of the board.
+    :param width: The width of the board (see the generator of the type of board for its default).
+    :returns: The board.
+    '''
+    if board_type not in GENERATORS:
+        raise ValueError(f'unknown type of board: {board_type}')
+    return GENERATORS[board_type](height, width)
+
+def standard_board(size: str, board_type: str) -> Board:
+    '''
+    :param size: The size of the board (SMALL, MEDIUM or LARGE).
+    :param board_type: The type of board (CIRCLE, DIAMOND or TRIANGLE).
+    :returns: The board of the game, as in `constants.boards`.
+    '''
+    return GENERATORS[board_type](**STANDARD_BOARDS[(size, board_type)])
@@ -0,0 +1,218 @@
+import argparse
+import importlib
+import os
+import random
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
+from typing import Callable, Iterator, NamedTuple
+
+from .bot import beam_policy
+from .constants import boards
+from .game import block_value, clear_lines, lines_score
+from .generator import board_pool
+from .journal import JournalWriter
+from .state import GameState
+
+# A policy chooses the move of a turn: it receives the game (with its blocks already offered)
+# and a random generator of its own, and returns the (block index, x, y) to play.
+Policy = Callable[[GameState, random.Random], tuple[int, int, int]]
+
+
+class GameResult(NamedTuple):
+    '''
+    The outcome of a simulated game.
+    '''
+    seed: int
+    score: int
+    turns: int
+    lines_cleared: int
+    # 'no_move' when no offered block could be placed, 'max_turns' when the game was stopped.
+    end_cause: str
+
+
+def moves(state: GameState) -> list[tuple[int, int, int]]:
+    '''
+    Lists all the moves available with the current offer.
+
+    :param state: The game.
+    :returns: The (block index, x, y) moves.
+    '''
+    return [(k, x, y) for k in range(len(state.offered)) for (x, y) in state.board.placements(state.offered[k])]
+
+def random_policy(state: GameState, rng: random.Random) -> tuple[int, int, int]:
+    '''
+    Plays any of the available moves.
+    '''
+    return rng.choice(moves(state))
+
+def greedy_policy(state: GameState, rng: random.Random) -> tuple[int, int, int]:
+    '''
+    Plays the move earning the most points this turn. Ties are broken randomly.
+    '''
+    best = -1
+    best_moves = []
+    board = state.board
+    for (k, x, y) in moves(state):
+        piece = state.offered[k]
+        after = board.copy()
+        after.place(piece, x, y)
+        (rows, cols, row_cells, col_cells) = clear_lines(after)
+        value = block_value(piece) + lines_score(len(rows), len(cols), row_cells, col_cells)
+        if value > best:
+            best = value
+            best_moves = [(k, x, y)]
+        elif value == best:
+            best_moves.append((k, x, y))
+    return rng.choice(best_moves)
+
+POLICIES: dict[str, Policy] = {
+    'random': random_policy,
+    'greedy': greedy_policy,
+    'beam': beam_policy(),
+}
+
+def play_game(board_type: str, size: str, difficulty: int, policy: Policy, max_turns: int, seed: int, journal_dir: str | None = None,
+              bag: bool = False, weights: tuple[int, ...] | None = None) -> GameResult:
+    '''
+    Plays a whole game without any input or output.
+
+    :param board_type: The type of board (CIRCLE, DIAMOND or TRIANGLE).
+    :param size: The size of the board (SMALL, MEDIUM or LARGE).
+    :param difficulty: The difficulty of the game (1: Easy, 2: Normal).
+    :param policy: The policy choosing the moves.
+    :param max_turns: The number of turns after which the game is stopped.
+    :param seed: The seed of the game. The result only depends on it and on the other parameters.
+    :param journal_dir: The directory in which the journal of the game is written, if any.
+    :param bag: Whether the blocks are dealt from a shuffled bag (see `generator.BlockGenerator`).
+    :param weights: The weight of each block of the pool (see `generator.board_pool`), 1 for all of them by default.
+    :returns: The outcome of the game.
+    '''
+    state = GameState(getattr(boards, f'{size}_{board_type}_BOARD'), board_type, difficulty, seed=seed, bag=bag, weights=weights)
+    if journal_dir is not None:
+        state.journal = JournalWriter(os.path.join(journal_dir, f'{board_type}-{size}-{difficulty}-{seed}.efj'), state)
+    # The policy gets its own generator so that its choices don't shift the blocks being offered.
+    rng = random.Random(f'{seed}:policy')
+    lines = 0
+    while state.turn < max_turns:
+        state.offer()
+        if state.is_over():
+            break
+        result = state.step(*policy(state, rng))
+        if not result.placed:
+            raise ValueError(f'the policy played an invalid move on turn {state.turn}')
+        # The lines without playable cells are "cleared" every time (which the score counts), but aren't lines to the player.
+        board = state.board
+        lines += len(set(result.cleared_rows) - board.empty_rows) + len(set(result.cleared_cols) - board.empty_cols)
+    else:
+        state.end('max_turns')
+    if state.journal is not None:
+        state.journal.close()
+    return GameResult(seed, state.score, state.turn, lines, state.end_cause)
+
+def simulate(
+    board_type: str,
+    size: str,
+    difficulty: int,
+    games: int,
+    policy: str | Policy = 'random',
+    seed: int = 0,
+    workers: int | None = None,
+    chunk_size: int = 16,
+    max_turns: int = 10_000,
+    journal_dir: str | None = None,
+    bag: bool = False,
+    weights: tuple[int, ...] | None = None,
+) -> Iterator[GameResult]:
+    '''
+    Plays many games, spread across several processes. The game `k` is played with the seed `seed + k`.
+    Results are streamed in the order of the games, and are the same whatever the number of workers.
+
+    :param board_type: The type of board (CIRCLE, DIAMOND or TRIANGLE).
+    :param size: The size of the board (SMALL, MEDIUM or LARGE).
+    :param difficulty: The difficulty of the games (1: Easy, 2: Normal).
+    :param games: How many games to play.
+    :param policy: The name of one of the `POLICIES`, or a policy. It must be a module-level function to be sent to workers.
+    :param seed: The seed of the first game.
+    :param workers: The number of processes to use (defaults to the number of CPUs). With 1, games are played in this process.
+    :param chunk_size: How many games are sent to a worker at once.
+    :param max_turns: The number of turns after which a game is stopped.
+    :param journal_dir: The directory in which the journal of every game is written, if any.
+    :param bag: Whether the blocks are dealt from a shuffled bag.
+    :param weights: The weight of each block of the pool, 1 for all of them by default.
+    :returns: An iterator over the results of the games.
+    '''
+    if isinstance(policy, str):
+        policy = POLICIES[policy]
+    play = partial(play_game, board_type.upper(), size.upper(), difficulty, policy, max_turns, journal_dir=journal_dir, bag=bag,
+                   weights=weights)
+    seeds = range(seed, seed + games)
+    if workers == 1:
+        yield from map(play, seeds)
+        return
+    with ProcessPoolExecutor(workers) as executor:
+        yield from executor.map(play, seeds, chunksize=chunk_size)
+
+def summarize(results: list[GameResult]) -> dict:
+    '''
+    Computes aggregate statistics over simulated games.
+
+    :param results: The results of the games.
+    :returns: A dictionary of statistics.
+    '''
+    if not results:
+        return {'games': 0}
+    scores = sorted(r.score for r in results)
+    return {
+        'games': len(results),
+        'mean_score': sum(scores) / len(scores),
+        'median_score': scores[len(scores) // 2],
+        'min_score': scores[0],
+        'max_score': scores[-1],
+        'mean_turns': sum(r.turns for r in results) / len(results),
+        'mean_lines_cleared': sum(r.lines_cleared for r in results) / len(results),
+        'end_causes': dict(Counter(r.end_cause for r in results)),
+    }
+
+def load_policy(name: str) -> Policy:
+    '''
+    :param name: The name of one of the `POLICIES`, or the path of a function like `module:function`.
+    :returns: The policy.
+    '''
+    if name in POLICIES:
+        return POLICIES[name]
+    (module, _, function) = name.partition(':')
+    return getattr(importlib.import_module(module), function)
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description='Plays many Efreitris games with a policy and reports statistics.')
+    parser.add_argument('board', choices=['CIRCLE', 'DIAMOND', 'TRIANGLE'], type=str.upper)
+    parser.add_argument('size', choices=['SMALL', 'MEDIUM', 'LARGE'], type=str.upper)
+    parser.add_argument('-n', '--games', type=int, default=100)
+    parser.add_argument('-d', '--difficulty', type=int, choices=[1, 2], default=2, help='1: Easy, 2: Normal')
+    parser.add_argument('-p', '--policy', default='random', help='random, greedy, beam or module:function')
+    parser.add_argument('-s', '--seed', type=int, default=0)
+    parser.add_argument('-w', '--workers', type=int, default=None)
+    parser.add_argument('--chunk-size', type=int, default=16)
+    parser.add_argument('--max-turns', type=int, default=10_000)
+    parser.add_argument('--journal-dir', default=None, help='write the journal of every game in this directory')
+    parser.add_argument('--bag', action='store_true', help='deal the blocks from a shuffled bag')
+    parser.add_argument('--weights', type=lambda s: tuple(int(w) for w in s.split(',')), default=None,
+                        help='the weight of each block of the pool, separated by commas (1 for all of them by default)')
+    parser.add_argument('-q', '--quiet', action='store_true', help='only print the statistics')
+    args = parser.parse_args()
+    if args.weights is not None and len(args.weights) != len(board_pool(args.board, args.difficulty)):
+        parser.error(f'--weights needs one weight per block of the pool: {len(board_pool(args.board, args.difficulty))}')
+
+    results = []
+    for result in simulate(args.board, args.size, args.difficulty, args.games, load_policy(args.policy),
+                           args.seed, args.workers, args.chunk_size, args.max_turns, args.journal_dir, args.bag,
+                           args.weights):
+        results.append(result)
+        if not args.quiet:
+            print(f'seed={result.seed} score={result.score} turns={result.turns} lines={result.lines_cleared} end={result.end_cause}')
+    for (key, value) in summarize(results).items():
+        print(f'{key}: {value}')
+
+if __name__ == '__main__':
+    main()
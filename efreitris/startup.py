@@ -0,0 +1,46 @@
+'''
+Measures how long it takes to import the game, in fresh interpreters, and checks it against the targets:
+    python -m efreitris.startup
+'''
+import argparse
+import os
+import subprocess
+import sys
+
+# Maximum import time of each module, in milliseconds.
+# Importing the package must be instant, and the engine must be usable by tools and tests without delay.
+TARGETS_MS = {
+    'efreitris': 2,
+    'efreitris.state': 25,
+    'efreitris.app': 30,
+}
+
+_MEASURE = 'import time; t = time.perf_counter(); import {}; print(time.perf_counter() - t)'
+
+
+def import_time(module: str, runs: int = 5) -> float:
+    '''
+    :param module: The module to import.
+    :param runs: The number of interpreters to start. The best time is kept, as the others only add noise.
+    :returns: The time taken to import the module, in milliseconds.
+    '''
+    root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    times = []
+    for _ in range(runs):
+        out = subprocess.run([sys.executable, '-c', _MEASURE.format(module)], cwd=root, capture_output=True, text=True, check=True).stdout
+        times.append(float(out) * 1000)
+    return min(times)
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description='Checks that importing Efreitris is fast enough.')
+    parser.add_argument('-r', '--runs', type=int, default=5)
+    args = parser.parse_args()
+    failed = False
+    for (module, target) in TARGETS_MS.items():
+        ms = import_time(module, args.runs)
+        print(f'{module}: {ms:.1f} ms (target: {target} ms)')
+        failed |= ms > target
+    sys.exit(1 if failed else 0)
+
+if __name__ == '__main__':
+    main()
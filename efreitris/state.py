@@ -0,0 +1,171 @@
+import random
+from collections import namedtuple
+
+from .bitboard import Bitboard, PlacementCounts
+from .game import block_value, clear_lines, has_any_move, lines_score
+from .generator import BlockGenerator, board_pool
+from .pieces import Piece
+
+
+class StepResult(namedtuple('StepResult', ['placed', 'piece', 'cleared_rows', 'cleared_cols', 'cells_cleared', 'score_delta'],
+                            defaults=(None, (), (), 0, 0))):
+    '''
+    The outcome of a move:
+        - placed: Whether the block could be placed. If not, nothing else has changed.
+        - piece: The piece which was placed.
+        - cleared_rows, cleared_cols: The indexes of the cleared rows and columns, including the lines without playable
+          cells (see `Bitboard.empty_cols`), which are cleared with the others and count in the score.
+        - cells_cleared: How many cells the cleared lines contained.
+        - score_delta: The points earned by this move.
+    '''
+    __slots__ = ()
+
+
+class GameState:
+    '''
+    The state of one game, without any input or output: the board, the score and the blocks offered to the player.
+    A turn consists in calling `offer` to draw the blocks, then `step` to place one of them.
+    '''
+
+    def __init__(self, board: list[list[int]] | Bitboard, board_type: str, difficulty: int, score: int = 0, seed: int | None = None,
+                 bag: bool = False, weights: tuple[int, ...] | None = None):
+        '''
+        :param board: The board to play on. It is copied, not modified.
+        :param board_type: The type of board (CIRCLE, DIAMOND or TRIANGLE).
+        :param difficulty: The difficulty of the game (1: Easy, 2: Normal).
+        :param score: The score to start from, when resuming a game.
+        :param seed: The seed of the random generator drawing the blocks. A random one is picked if it isn't given.
+        :param bag: Whether the blocks are dealt from a shuffled bag (see `generator.BlockGenerator`).
+        :param weights: The weight of each block of the pool (see `generator.board_pool`), 1 for all of them by default.
+        :raises ValueError: If the weights don't match the blocks of the pool.
+        '''
+        self.board = board.copy() if isinstance(board, Bitboard) else Bitboard(board)
+        self.board_type = board_type
+        self.difficulty = difficulty
+        self.score = score
+        self.turn = 0
+        # In easy mode, the blocks of the board are offered in addition to the common ones.
+        self.generator = BlockGenerator(board_pool(board_type, difficulty, weights), seed, bag)
+        self.pool = self.generator.pool.pieces
+        self.offer_size = 10 if difficulty == 1 else 5
+        # The seed is always known, so that any game can be journaled and replayed.
+        self.seed = self.generator.seed
+        # The number of placements of the offered blocks, only counted when asked for (see `placements_available`).
+        self.counts = PlacementCounts(self.board)
+        self.offered: list[Piece] = []
+        # The indexes of the offered blocks in the pool.
+        self.offered_indexes: list[int] = []
+        # The indexes of the blocks of the next offer, and the generator after drawing them, once prefetched.
+        self.upcoming: tuple[list[int], BlockGenerator] | None = None
+        # The journal recording every move, if any (see `journal.JournalWriter`).
+        self.journal = None
+        # Why the game ended: 'no_move' when no offered block fits, or any reason given to `end`.
+        self.end_cause: str | None = None
+
+    def offer(self) -> list[Piece]:
+        '''
+        Draws the blocks offered for the current turn. Ends the game if none of them can be placed.
+
+        :returns: The offered blocks.
+        '''
+        if self.upcoming is None:
+            self.offered_indexes = self.generator.offer(self.offer_size)
+        else:
+            (self.offered_indexes, self.generator) = self.upcoming
+            self.upcoming = None
+        self.offered = [self.pool[k] for k in self.offered_indexes]
+        if not has_any_move(self.board, self.offered):
+            self.end('no_move')
+        return self.offered
+
+    def prefetch(self) -> list[Piece]:
+        '''
+        Draws the blocks of the next offer ahead of time (e.g. while the player is thinking), from a copy of the
+        generator: the game's generator is only advanced when `offer` offers them, so the blocks drawn and the journal
+        are the same as without prefetching.
+
+        :returns: The blocks the next call to `offer` will offer.
+        '''
+        if self.upcoming is None:
+            ahead = self.generator.copy()
+            self.upcoming = (ahead.offer(self.offer_size), ahead)
+        return [self.pool[k] for k in self.upcoming[0]]
+
+    def placements_available(self) -> int:
+        '''
+        :returns: The number of (block, position) moves available with the current offer.
+        '''
+        self.counts.track(self.offered)
+        return self.counts.total(self.offered)
+
+    def can_place(self, block_index: int, x: int, y: int) -> bool:
+        '''
+        :param block_index: The index of the block in the current offer.
+        :param x: The x coordinate of the block on the board.
+        :param y: The y coordinate of the block on the board (from the bottom of the block).
+        :returns: Whether the block can be placed at (x, y).
+        '''
+        return 0 <= block_index < len(self.offered) and self.board.fits(self.offered[block_index], x, y)
+
+    def step(self, block_index: int, x: int, y: int) -> StepResult:
+        '''
+        Places one of the offered blocks, clears the full lines and updates the score.
+
+        :param block_index: The index of the block in the current offer.
+        :param x: The x coordinate of the block on the board.
+        :param y: The y coordinate of the block on the board (from the bottom of the block).
+        :returns: What the move did.
+        '''
+        if self.end_cause is not None or not self.can_place(block_index, x, y):
+            return StepResult(False)
+        piece = self.offered[block_index]
+        board = self.board
+        board.place(piece, x, y)
+        self.counts.placed(piece, y)
+        # The lines without playable cells are cleared by every move (see `Bitboard.empty_rows`). Such a column has
+        # nothing to clear, and such a row only changes the board if there are filled cells above it to fall.
+        top = next((i for i in range(board.height) if board.filled[i]), board.height) if board.empty_rows else board.height
+        (rows, cols, row_cells, col_cells) = clear_lines(board)
+        moved = [i for i in rows if i not in board.empty_rows or top < i]
+        # A cleared column changes every row, while a cleared row only moves the rows above it.
+        if any(j not in board.empty_cols for j in cols):
+            self.counts.changed(0, board.height - 1)
+        elif moved:
+            self.counts.changed(0, moved[-1])
+        delta = block_value(piece) + lines_score(len(rows), len(cols), row_cells, col_cells)
+        self.score += delta
+        self.turn += 1
+        if self.journal is not None:
+            self.journal.record(self, block_index, x, y)
+        self.offered = []
+        self.offered_indexes = []
+        return StepResult(True, piece, tuple(rows), tuple(cols), row_cells + col_cells, delta)
+
+    @property
+    def rng(self) -> random.Random:
+        '''
+        The random generator drawing the blocks.
+        '''
+        return self.generator.rng
+
+    @property
+    def board_hash(self) -> int:
+        '''
+        The Zobrist hash of the board (see `Bitboard.zobrist`), kept up to date by every move.
+        '''
+        return self.board.zobrist
+
+    def end(self, cause: str) -> None:
+        '''
+        Ends the game.
+
+        :param cause: Why the game ended (e.g. 'attempts' when the player failed to place a block too many times).
+        '''
+        if self.end_cause is None:
+            self.end_cause = cause
+
+    def is_over(self) -> bool:
+        '''
+        :returns: Whether the game has ended.
+        '''
+        return self.end_cause is not None